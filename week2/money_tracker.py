@@ -1,4 +1,5 @@
 import itertools 
+import bisect
 import sys
 import re
 
@@ -11,6 +12,63 @@ TYPE_INDEX = 3
 EXPENSE_STR = 'New Expense'
 INCOME_STR = 'New Income'
 
+class UserData:
+    # maps dates (dd-mm-yyyy strings) to their {'income': [...], 'expense': [...]} dicts like a dict does,
+    # but the dates are iterated in chronological order and can be queried by range.
+    # representation:
+    # self._data is the dict from dates to their dicts, so looking up a date is O(1)
+    # self._dates is the list of the dates in chronological order and
+    # self._keys is the list of their (year, month, day) keys, in the same order.
+    
+    def __init__(self):
+        self._data = {}
+        self._dates = []
+        self._keys = []
+
+    def __contains__(self, date):
+        return date in self._data
+
+    def __getitem__(self, date):
+        return self._data[date]
+
+    def __setitem__(self, date, date_data):
+        if date not in self._data:
+            key = date_key(date)
+            if self._keys and key < self._keys[-1]:
+                i = bisect.bisect(self._keys, key)
+                self._keys.insert(i, key)
+                self._dates.insert(i, date)
+            else: # the common case: dates are added in chronological order
+                self._keys.append(key)
+                self._dates.append(date)
+        self._data[date] = date_data
+
+    def setdefault(self, date, default):
+        if date not in self._data:
+            self[date] = default
+        return self._data[date]
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._dates)
+
+    def items(self):
+        return ((date, self._data[date]) for date in self._dates)
+
+    def dates_between(self, start, end):
+        # returns the list of the dates d with @start <= d <= @end (both dd-mm-yyyy strings),
+        # in chronological order. takes O(log n + k) time, where k is the number of such dates
+        start_i = bisect.bisect_left(self._keys, date_key(start))
+        end_i = bisect.bisect_right(self._keys, date_key(end))
+        return self._dates[start_i:end_i]
+
+def date_key(date):
+    # returns the (year, month, day) triple of the dd-mm-yyyy string @date, which orders dates chronologically
+    day, month, year = map(int, date.split('-'))
+    return (year, month, day)
+
 def extract_parts_from_entry(entry, parts):
     # parts can be a tuple or a str. if it is a tuple, it's elements must be from {'date', 'amount', 'category', 'type'}
     # in that case, it returns a tuple, whose ith element is the part of entry corresponding to the word in parts[i]
@@ -90,6 +148,37 @@ def get_entries_at_date(user_data, date, parts=('amount', 'category', 'type')):
     return extract_parts_from_entries(itertools.chain(income_entries, expense_entries), parts)
     
     
+def get_entries_between(user_data, start, end, parts=('date', 'amount', 'category', 'type')):
+    # returns a list of the parts of the entries whose dates d satisfy @start <= d <= @end
+    # the entries are in chronological order; incomes come before expenses on the same date
+    result = []
+    for date in user_data.dates_between(start, end):
+        result.extend(get_entries_at_date(user_data, date, parts))
+    return result
+
+def get_incomes_between(user_data, start, end, parts=('date', 'amount', 'category')):
+    # like get_entries_between, but only for incomes
+    return [extract_parts_from_entry((date, amount, category, 'income'), parts)
+            for date in user_data.dates_between(start, end)
+            for amount, category in user_data[date]['income']]
+
+def get_expenses_between(user_data, start, end, parts=('date', 'amount', 'category')):
+    # like get_entries_between, but only for expenses
+    return [extract_parts_from_entry((date, amount, category, 'expense'), parts)
+            for date in user_data.dates_between(start, end)
+            for amount, category in user_data[date]['expense']]
+
+def month_range(month, year):
+    # returns the (first, last) dd-mm-yyyy dates of the month @month of the year @year
+    # the last date is the 31st, which is fine for range queries even in shorter months
+    return (f'01-{month:02}-{year:04}', f'31-{month:02}-{year:04}')
+
+def get_incomes_in_month(user_data, month, year, parts=('date', 'amount', 'category')):
+    return get_incomes_between(user_data, *month_range(month, year), parts)
+
+def get_expenses_in_month(user_data, month, year, parts=('date', 'amount', 'category')):
+    return get_expenses_between(user_data, *month_range(month, year), parts)
+
 def show_user_data_per_date(date, all_user_data):
     return [(amount, category, EXPENSE_STR if _type == 'expense' else INCOME_STR)
             for amount, category, _type in get_entries_at_date(all_user_data, date)]
@@ -163,13 +252,13 @@ def parse_lines(lines):
         # returns None if not possible
         return 'income' if _type == INCOME_STR else 'expense' if _type == EXPENSE_STR else None
         
-    out = {}
+    out = UserData()
     lines_iter = iter(lines)
     
     try: # parse the first line
         current = parse_line(next(lines_iter))
     except StopIteration: # when lines is empty
-        return {}
+        return out
     
     if current is None:
         raise ValueError('unable to parse first line')
@@ -0,0 +1,72 @@
+import random
+import unittest
+import money_tracker
+from money_tracker import UserData, add_income, add_expense
+
+def random_date(rand):
+    return f'{rand.randint(1, 28):02}-{rand.randint(1, 12):02}-{rand.choice((1999, 2000, 2001)):04}'
+
+class TestRangeQueries(unittest.TestCase):
+    def setUp(self):
+        # the entries are added out of chronological order
+        rand = random.Random(7)
+        self.entries = []
+        self.user_data = UserData()
+        for i in range(300):
+            date, amount, category = random_date(rand), rand.randint(1, 100), rand.choice(('food', 'rent', 'fun'))
+            if rand.random() < 0.3:
+                add_income(category, amount, date, self.user_data)
+                self.entries.append((date, amount, category, 'income'))
+            else:
+                add_expense(category, amount, date, self.user_data)
+                self.entries.append((date, amount, category, 'expense'))
+
+    def reference(self, start, end, _type):
+        # the entries between @start and @end, ordered by date, in the order they were added on each date
+        start_key, end_key = money_tracker.date_key(start), money_tracker.date_key(end)
+        entries = [entry for entry in self.entries
+                   if start_key <= money_tracker.date_key(entry[0]) <= end_key and entry[3] == _type]
+        return [entry[:3] for entry in sorted(entries, key=lambda entry: money_tracker.date_key(entry[0]))]
+
+    def test_dates_in_order(self):
+        keys = [money_tracker.date_key(date) for date in self.user_data]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(set(self.user_data), {entry[0] for entry in self.entries})
+        self.assertEqual(len(self.user_data), len(set(self.user_data)))
+
+    def test_dates_between(self):
+        dates = list(self.user_data)
+        for start, end in (('01-01-1999', '31-12-2001'), ('15-06-1999', '15-06-2000'),
+                           ('01-01-1990', '31-12-1998'), ('02-03-2000', '01-03-2000'), (dates[5], dates[5])):
+            start_key, end_key = money_tracker.date_key(start), money_tracker.date_key(end)
+            self.assertEqual(self.user_data.dates_between(start, end),
+                             [date for date in dates if start_key <= money_tracker.date_key(date) <= end_key])
+
+    def test_get_between(self):
+        for start, end in (('01-01-1999', '31-12-2001'), ('15-06-1999', '15-06-2000'), ('02-03-2000', '01-03-2000')):
+            self.assertEqual(money_tracker.get_incomes_between(self.user_data, start, end),
+                             self.reference(start, end, 'income'))
+            self.assertEqual(money_tracker.get_expenses_between(self.user_data, start, end),
+                             self.reference(start, end, 'expense'))
+            self.assertEqual(money_tracker.get_incomes_between(self.user_data, start, end, ('amount',)),
+                             [entry[1:2] for entry in self.reference(start, end, 'income')])
+
+    def test_get_in_month(self):
+        for month, year in ((1, 1999), (2, 2000), (12, 2001)):
+            start, end = f'01-{month:02}-{year}', f'31-{month:02}-{year}'
+            self.assertEqual(money_tracker.get_incomes_in_month(self.user_data, month, year),
+                             self.reference(start, end, 'income'))
+            self.assertEqual(money_tracker.get_expenses_in_month(self.user_data, month, year),
+                             self.reference(start, end, 'expense'))
+
+    def test_get_entries_between(self):
+        start, end = '01-03-2000', '30-09-2000'
+        entries = money_tracker.get_entries_between(self.user_data, start, end)
+        for date in self.user_data.dates_between(start, end):
+            on_date = [entry for entry in entries if entry[0] == date]
+            # incomes come before expenses on the same date
+            self.assertEqual(on_date, [entry for entry in self.entries if entry[0] == date and entry[3] == 'income'] +
+                                      [entry for entry in self.entries if entry[0] == date and entry[3] == 'expense'])
+        self.assertEqual(len(entries), len(self.reference(start, end, 'income')) + len(self.reference(start, end, 'expense')))
+
+unittest.main()
@@ -0,0 +1,39 @@
+import sys
+import time
+import random
+import functools
+import simplify_fractions
+
+# compares collect_fractions with folding the fractions with add_fractions_partial, which it replaced
+# usage: bench_fractions.py [largest number of fractions]
+
+MAX_DENOMINATOR = 10 ** 4
+# folding is quadratic in the size of the numbers (46s for 10 ** 5 fractions), so above this many
+# fractions only collect_fractions is timed
+MAX_FOLDED = 10 ** 4
+
+def random_fractions(n, seed=0):
+    rand = random.Random(seed)
+    return [(rand.randrange(-10 ** 6, 10 ** 6), rand.randrange(1, MAX_DENOMINATOR)) for i in range(n)]
+
+def time_it(proc):
+    start = time.perf_counter()
+    result = proc()
+    return time.perf_counter() - start, result
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    n = 10 ** 3
+    while n <= largest:
+        fractions = random_fractions(n)
+        bulk_time, bulk_sum = time_it(lambda: simplify_fractions.collect_fractions(fractions))
+        if n <= MAX_FOLDED:
+            fold_time, fold_sum = time_it(lambda: functools.reduce(simplify_fractions.add_fractions_partial, fractions))
+            assert bulk_sum == fold_sum
+            print(f'{n} fractions: fold {fold_time:.3f}s, bulk {bulk_time:.3f}s ({fold_time / bulk_time:.1f}x)')
+        else:
+            print(f'{n} fractions: bulk {bulk_time:.3f}s')
+        n *= 10
+
+if __name__ == '__main__':
+    main()
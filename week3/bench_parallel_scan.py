@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+import tempfile
+import queries
+import bench_tokenizer
+
+# compares filter_database on a table which is not cached with filter_database_parallel
+# usage: bench_parallel_scan.py [number of rows]
+
+WORKER_COUNTS = (1, 2, 4, 8)
+QUERIES = {'filter': {'age__lt': 10, 'city__startswith': 'city1'},
+           'filter and order': {'age__lt': 10, 'city__startswith': 'city1', 'order_by': 'score'}}
+
+def time_it(proc):
+    start = time.perf_counter()
+    result = proc()
+    return time.perf_counter() - start, result
+
+def serial_filter(filename, **kwargs):
+    queries.table_cache.clear()
+    return queries.filter_database(filename, **kwargs)
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'table.csv')
+        bench_tokenizer.write_table(filename, rows)
+        print(f'{rows} rows, {os.path.getsize(filename) / 2 ** 20:.0f} MiB, {os.cpu_count()} cpus')
+        for name, kwargs in QUERIES.items():
+            serial_time, serial_result = time_it(lambda: serial_filter(filename, **kwargs))
+            print(f'{name}: serial {serial_time:.2f}s')
+            for workers in WORKER_COUNTS:
+                parallel_time, parallel_result = time_it(
+                    lambda: queries.filter_database_parallel(filename, workers, **kwargs))
+                assert parallel_result == serial_result
+                print(f'    {workers} workers: {parallel_time:.2f}s ({serial_time / parallel_time:.2f}x)')
+
+if __name__ == '__main__':
+    main()
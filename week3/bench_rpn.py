@@ -0,0 +1,80 @@
+import sys
+import time
+import random
+import rpn
+
+# compares rpn.evaluate_expr with the operations stack algorithm it replaced
+# usage: bench_rpn.py [number of tokens]
+
+def evaluate_expr_by_operations_stack(expr):
+    # the previous evaluate_expr
+    if len(expr) == 1:
+        if rpn.is_operation(expr[0]):
+            raise ValueError('cannot evaluate an expression consisting only of an operation')
+        return expr[0]
+    if not rpn.is_operation(expr[-1]):
+        raise ValueError('every expression with more than 1 items must end with an operation')
+
+    operations_stack = []
+    reversed_expr_iter = reversed(expr)
+    for item in reversed_expr_iter:
+        if rpn.is_operation(item):
+            operations_stack.append({'op': item, 'stack': []})
+        else:
+            current_sub_stack = operations_stack[-1]['stack']
+            current_operation = operations_stack[-1]['op']
+
+            current_sub_stack.append(item)
+
+            # squeeze the operations_stack as much as possible
+            while len(current_sub_stack) == current_operation['arity']:
+                latest_value = rpn.eval_operation(current_operation, reversed(current_sub_stack))
+                operations_stack.pop()
+                if not operations_stack:
+                    break
+                current_sub_stack = operations_stack[-1]['stack']
+                current_operation = operations_stack[-1]['op']
+                current_sub_stack.append(latest_value)
+
+            if not operations_stack: # squeezed to the end
+                if not rpn.iterator_is_empty(reversed_expr_iter):
+                    raise ValueError(' too many items.')
+                return latest_value
+    raise ValueError('not enough items.')
+
+def random_expr_str(tokens, seed=0):
+    # returns a valid expression of about @tokens tokens, which mixes deep and wide parts
+    rand = random.Random(seed)
+    result = []
+    depth = 0 # the number of values on the stack
+    while len(result) < tokens or depth > 1:
+        if depth >= 3 and rand.random() < 0.2:
+            result.append('min3')
+            depth -= 2
+        elif depth >= 2 and (len(result) >= tokens or rand.random() < 0.45):
+            result.append(rand.choice(['+', '*', 'min', 'max']))
+            depth -= 1
+        elif depth >= 1 and rand.random() < 0.05:
+            result.append('abs')
+        else:
+            result.append(str(rand.randrange(1, 10)))
+            depth += 1
+    return ' '.join(result)
+
+def time_it(proc):
+    start = time.perf_counter()
+    result = proc()
+    return time.perf_counter() - start, result
+
+def main():
+    tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    expr = rpn.parse(random_expr_str(tokens))
+    old_time, old_value = time_it(lambda: evaluate_expr_by_operations_stack(expr))
+    new_time, new_value = time_it(lambda: rpn.evaluate_expr(expr))
+    assert new_value == old_value
+    print(f'{len(expr)} tokens')
+    print(f'operations stack: {old_time:.2f}s')
+    print(f'value stack: {new_time:.2f}s ({old_time / new_time:.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import queries
+
+# compares queries.parse_database_from_file with the character by character tokenizer it replaced
+# usage: bench_tokenizer.py [number of rows]
+
+def tokenize_line_by_chars(line):
+    # the previous tokenize_line
+    if not line:
+        raise ValueError('cannot tokenize the empty line')
+    result = []
+    current_token_chars = []
+    in_double_quotes = False
+    for char in line:
+        if char == ',':
+            if in_double_quotes:
+                current_token_chars.append(char)
+            else:
+                result.append(''.join(current_token_chars))
+                current_token_chars = []
+        elif char == '"':
+            in_double_quotes = not in_double_quotes
+        else:
+            current_token_chars.append(char)
+    if in_double_quotes:
+        raise ValueError(f'could not parse the line "{line}". missing closing double quote')
+    result.append(''.join(current_token_chars))
+    return result
+
+def parse_by_chars(filename):
+    # the previous parse_database_from_file
+    with open(filename) as f:
+        lines = [line[:-1] for line in f.readlines() if not line.isspace()]
+    column_types = queries.parse_column_types(lines[0])
+    records = []
+    for line in lines[2:]:
+        tokens = tokenize_line_by_chars(line)
+        records.append(tuple(data_type(token) for data_type, token in zip(column_types, tokens)))
+    return records
+
+def write_table(filename, rows, quoted_fraction=0.1):
+    rand = random.Random(0)
+    with open(filename, 'w') as f:
+        f.write('int,string,int,string,int,string\n')
+        f.write('id,name,age,city,score,note\n')
+        for i in range(rows):
+            note = '"a, quoted note"' if rand.random() < quoted_fraction else 'note'
+            f.write(f'{i},name{rand.randrange(1000)},{rand.randrange(100)},'
+                    f'city{rand.randrange(50)},{rand.randrange(10 ** 6)},{note}\n')
+
+def time_it(proc):
+    start = time.perf_counter()
+    result = proc()
+    return time.perf_counter() - start, result
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'table.csv')
+        write_table(filename, rows)
+        old_time, old_records = time_it(lambda: parse_by_chars(filename))
+        new_time, database = time_it(lambda: queries.parse_database_from_file(filename))
+        assert database.records == old_records
+    print(f'{rows} rows')
+    print(f'character by character: {old_time:.2f}s')
+    print(f'split and bulk conversion: {new_time:.2f}s ({old_time / new_time:.1f}x)')
+
+if __name__ == '__main__':
+    main()
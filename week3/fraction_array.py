@@ -0,0 +1,158 @@
+import math
+import operator
+import itertools
+from array import array
+import simplify_fractions
+
+class FractionArray:
+    # a sequence of fractions (see simplify_fractions), kept as two parallel arrays('q') of the
+    # numerators and the denominators instead of tuples. when some number does not fit in 64 bits,
+    # both are lists of ints instead. the denominators are kept positive: (1, -2) is kept as (-1, 2).
+    # the fractions are verified once, when the array is made; the operations work on whole
+    # columns (with map over the numbers), and return new arrays of simplified fractions.
+
+    def __init__(self, fractions=()):
+        # if any of the values in @fractions is not a valid fraction,
+        # an appropriate exception will be raised
+        fractions = list(fractions)
+        simplify_fractions.verify_fractions(fractions)
+        nums = [num for num, denom in fractions]
+        denoms = [denom for num, denom in fractions]
+        self._set(nums, denoms)
+
+    @classmethod
+    def _from_columns(cls, nums, denoms):
+        # assumes @nums and @denoms are lists of ints of the same length and @denoms are positive
+        result = cls.__new__(cls)
+        result._set(nums, denoms)
+        return result
+
+    def _set(self, nums, denoms):
+        if any(denom < 0 for denom in denoms):
+            nums = [-num if denom < 0 else num for num, denom in zip(nums, denoms)]
+            denoms = list(map(abs, denoms))
+        try:
+            self.nums, self.denoms = array('q', nums), array('q', denoms)
+        except OverflowError:
+            self.nums, self.denoms = list(nums), list(denoms)
+
+    def __len__(self):
+        return len(self.nums)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return FractionArray._from_columns(list(self.nums[key]), list(self.denoms[key]))
+        return (self.nums[key], self.denoms[key])
+
+    def __iter__(self):
+        return zip(self.nums, self.denoms)
+
+    def __eq__(self, other):
+        # equal if they have the same fractions, with the same numerators and denominators
+        if not isinstance(other, FractionArray):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f'FractionArray({list(self)})'
+
+    def tolist(self):
+        return list(self)
+
+    def _operands(self, other):
+        # returns the numerators and denominators of @other, a FractionArray of the same length or a
+        # fraction, which is used for every element
+        if isinstance(other, FractionArray):
+            if len(other) != len(self):
+                raise ValueError(f'the arrays must have the same length, but have {len(self)} and {len(other)}')
+            return other.nums, other.denoms
+        simplify_fractions.verify_fraction(other)
+        num, denom = other
+        if denom < 0:
+            num, denom = -num, -denom
+        return [num] * len(self), [denom] * len(self)
+
+    def __add__(self, other):
+        # returns the array of the simplified sums of the elements of this array and @other,
+        # a FractionArray of the same length or a fraction
+        nums2, denoms2 = self._operands(other)
+        nums = list(map(operator.add, map(operator.mul, self.nums, denoms2), map(operator.mul, nums2, self.denoms)))
+        denoms = list(map(operator.mul, self.denoms, denoms2))
+        return _simplified(nums, denoms)
+
+    __radd__ = __add__
+
+    def __mul__(self, other):
+        # returns the array of the simplified products, like __add__
+        nums2, denoms2 = self._operands(other)
+        return _simplified(list(map(operator.mul, self.nums, nums2)), list(map(operator.mul, self.denoms, denoms2)))
+
+    __rmul__ = __mul__
+
+    def simplify(self):
+        # returns the array of the simplified fractions
+        return _simplified(list(self.nums), list(self.denoms))
+
+    def sum(self):
+        # returns the simplified sum of the fractions ((0, 1) if there are none)
+        return simplify_fractions.sum_fractions_partial(self)
+
+    def min(self):
+        # returns the smallest fraction (the first one, if there are equal ones)
+        # a ValueError is raised if the array is empty
+        return self[self._extreme_index(min)]
+
+    def max(self):
+        # returns the largest fraction (the first one, if there are equal ones)
+        # a ValueError is raised if the array is empty
+        return self[self._extreme_index(max)]
+
+    def _extreme_index(self, extreme):
+        # returns the index of extreme(self, key=fraction_key), where @extreme is min or max.
+        # only the fractions whose floats are the extreme float are compared exactly
+        approximations = self._approximations()
+        if approximations is None:
+            indexes = range(len(self))
+        else:
+            value = extreme(approximations)
+            indexes = itertools.compress(itertools.count(), map(value.__eq__, approximations))
+        return extreme(indexes, key=lambda i: simplify_fractions.fraction_key(self[i]))
+
+    def _approximations(self):
+        # returns the list of the nearest floats of the fractions, or None if some is too big for a float
+        try:
+            return list(map(operator.truediv, self.nums, self.denoms))
+        except OverflowError:
+            return None
+
+    def argsort(self, reverse=False):
+        # returns the list of the indexes of the fractions in the order of their values
+        # (equal fractions keep their order).
+        # the indexes are sorted by the floats of the fractions (which are in the order of the
+        # fractions, where they differ), and then the runs of equal floats by the exact fractions
+        approximations = self._approximations()
+        if approximations is None:
+            keys = list(map(simplify_fractions.fraction_key, self))
+            return sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+        result = sorted(range(len(approximations)), key=approximations.__getitem__, reverse=reverse)
+        start = 0
+        for approximation, run in itertools.groupby(map(approximations.__getitem__, result)):
+            length = sum(1 for i in run)
+            if length > 1:
+                result[start:start + length] = sorted(
+                    result[start:start + length], reverse=reverse,
+                    key=lambda i: simplify_fractions.fraction_key(self[i]))
+            start += length
+        return result
+
+    def sort(self, reverse=False):
+        # sorts the fractions in place, like sort_fractions
+        order = self.argsort(reverse)
+        self._set(list(map(self.nums.__getitem__, order)), list(map(self.denoms.__getitem__, order)))
+
+def _simplified(nums, denoms):
+    # returns the FractionArray of the simplified fractions @nums[i] / @denoms[i], where
+    # @denoms are positive
+    gcds = list(map(math.gcd, nums, denoms))
+    return FractionArray._from_columns(list(map(operator.floordiv, nums, gcds)),
+                                       list(map(operator.floordiv, denoms, gcds)))
@@ -1,12 +1,29 @@
-import itertools
+import os
 import re
+import sys
+import locale
 import operator
+import bisect
+import heapq
+import itertools
+import collections
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# the result of a search for a record which finds none
+_NO_RECORD = object()
 
 class Database:
     def __init__(self, types, column_names, records):
         self.types = types
         self.column_names = column_names
         self.records = records
+        self.indexes = {} # column name -> {index kind: index}
+        self._records_size = None # the estimated size of a list of records, computed once
     
     def get_column_key(self, column_name):
         coli = self.column_index(column_name)
@@ -22,10 +39,173 @@ class Database:
         
     def has_column(self, column_name):
         return column_name in self.column_names
+
+    def estimated_size(self):
+        # returns an estimate of the memory used by the records and the indexes, in bytes
+        if isinstance(self.records, (LazyRecords, ColumnarRecords)):
+            result = self.records.estimated_size()
+        else:
+            if self._records_size is None:
+                self._records_size = sys.getsizeof(self.records) + sum(map(sys.getsizeof, self.records))
+            result = self._records_size
+        return result + sum(index.estimated_size()
+                            for column_indexes in self.indexes.values()
+                            for index in column_indexes.values())
     
-    def generate_all_records_satisfying(self, conditions):
-        predicates = [self._make_predicate(condition) for condition in conditions]
-        return (record for record in self.records if all(predicate(record) for predicate in predicates))
+    def create_index(self, column_name, kind='hash'):
+        # builds (once) and returns an index of the column @column_name. @kind is one of INDEX_KINDS
+        coli = self.column_index(column_name)
+        if coli is None:
+            raise ValueError(f'"{column_name}" is not a valid column name')
+        index_class = INDEX_KINDS.get(kind)
+        if index_class is None:
+            raise ValueError(f'invalid index kind: "{kind}". expected one of {", ".join(INDEX_KINDS)}')
+        if index_class is PrefixTrie and self.types[coli] is not str:
+            raise ValueError(f'a prefix trie can only index a string column, but "{column_name}" is not one')
+        column_indexes = self.indexes.setdefault(column_name, {})
+        if kind not in column_indexes:
+            if isinstance(self.records, ColumnarRecords):
+                values = self.records.columns[coli]
+            else:
+                values = (record[coli] for record in self.records)
+            column_indexes[kind] = index_class(values)
+        return column_indexes[kind]
+
+    def plan(self, conditions, ordered=True):
+        # returns (rows, residual), where @rows is the increasing list (any collection if not @ordered)
+        # of the indexes of the records which satisfy the conditions answered by the indexes (None if
+        # no index applies, which means all records) and @residual are the conditions which still
+        # have to be checked on them.
+        # the most selective index lookup gives the candidates; the other lookups are intersected with
+        # them only while they are not much bigger, otherwise their conditions are checked directly.
+        # with ColumnarRecords, the conditions which are left are evaluated on the columns in bulk where
+        # possible.
+        lookups, residual = self._lookups(conditions)
+        rows = None
+        if lookups:
+            (size, index, predicate_name, extra_arg), condition = lookups[0]
+            rows = index.lookup(predicate_name, extra_arg)
+            if len(lookups) > 1:
+                rows = set(rows)
+                for (size, index, predicate_name, extra_arg), condition in lookups[1:]:
+                    if size <= INTERSECTION_RATIO * len(rows):
+                        rows.intersection_update(index.lookup(predicate_name, extra_arg))
+                    else:
+                        residual.append(condition)
+        if residual and isinstance(self.records, ColumnarRecords):
+            rows, residual = self._select_in_bulk(rows, residual)
+        if rows is None:
+            return None, residual
+        return (sorted(rows) if ordered else rows), residual
+
+    def _lookups(self, conditions):
+        # returns (lookups, residual), where @lookups are the ((size, index, predicate name, extra arg),
+        # condition) pairs of the conditions which an index answers, with the index which answers it
+        # with the fewest rows, sorted by that number, and @residual are the other conditions
+        lookups = []
+        residual = []
+        for condition in conditions:
+            column_name, predicate, extra_arg = condition
+            if not self.has_column(column_name):
+                raise ValueError(f'invalid column name in condition: {condition}')
+            best = None
+            predicate_name = PREDICATE_NAMES.get(predicate)
+            for index in self.indexes.get(column_name, {}).values():
+                size = index.estimate(predicate_name, extra_arg)
+                if size is not None and (best is None or size < best[0]):
+                    best = (size, index, predicate_name, extra_arg)
+            if best is None:
+                residual.append(condition)
+            else:
+                lookups.append((best, condition))
+        lookups.sort(key=lambda lookup: lookup[0][0])
+        return lookups, residual
+
+    def _select_in_bulk(self, rows, conditions):
+        # narrows @rows (None means all rows) by those of @conditions which the columns of the records
+        # can evaluate in bulk; returns the rows and the other conditions
+        residual = []
+        for condition in conditions:
+            column_name, predicate, extra_arg = condition
+            selected = self.records.select(self.column_index(column_name), PREDICATE_NAMES.get(predicate),
+                                           extra_arg, rows)
+            if selected is None:
+                residual.append(condition)
+            else:
+                rows = selected
+        return rows, residual
+
+    def generate_all_records_satisfying(self, conditions, order_by=None, limit=None):
+        # yields the records which satisfy @conditions, in the order of the table or, if @order_by is
+        # given, ordered by that column (ties in the order of the table), and stops after @limit of them.
+        # the records are found while iterating, unless they have to be sorted
+        key = None if order_by is None else self.get_column_key(order_by)
+        rows, residual = self.plan(conditions)
+        index_order = self._index_order(rows, order_by)
+        if key is None or index_order is not None:
+            records = self._records_satisfying(rows if index_order is None else index_order, residual)
+            return itertools.islice(records, limit)
+        records = self._records_satisfying(rows, residual)
+        if limit is None:
+            return iter(sorted(records, key=key))
+        return iter(heapq.nsmallest(limit, records, key=key))
+
+    def find_record(self, conditions, order_by=None, last=False):
+        # returns the first (the last if @last) record of generate_all_records_satisfying(@conditions,
+        # @order_by). raises IndexError if there is no such record.
+        # the records are not sorted: the sorted index of @order_by is walked from the start (or the
+        # end) if it can be, otherwise the records are scanned once for the minimum (or maximum)
+        key = None if order_by is None else self.get_column_key(order_by)
+        rows, residual = self.plan(conditions)
+        index_order = self._index_order(rows, order_by)
+        if key is None or index_order is not None:
+            records = self._records_satisfying(rows if index_order is None else index_order, residual,
+                                               reverse=last)
+            result = next(records, _NO_RECORD)
+        elif last:
+            # the maximum which comes last in the table, like the last of a stable sort
+            records = self._records_satisfying(rows, residual)
+            result = max(((key(record), i, record) for i, record in enumerate(records)),
+                         default=(None, None, _NO_RECORD))[2]
+        else:
+            result = min(self._records_satisfying(rows, residual), key=key, default=_NO_RECORD)
+        if result is _NO_RECORD:
+            raise IndexError('no record satisfies the conditions')
+        return result
+
+    def count_records_satisfying(self, conditions, limit=None):
+        # returns the number of records which satisfy @conditions, or @limit if it is smaller. when the
+        # indexes answer all of the conditions, no record is looked at, and when a single index
+        # answers them, its rows are not even looked up (its estimate is their number)
+        lookups, residual = self._lookups(conditions)
+        if len(lookups) == 1 and not residual:
+            result = lookups[0][0][0]
+            return result if limit is None else min(result, limit)
+        rows, residual = self.plan(conditions, ordered=False)
+        if not residual:
+            result = len(self.records) if rows is None else len(rows)
+            return result if limit is None else min(result, limit)
+        return sum(1 for record in itertools.islice(self._records_satisfying(rows, residual), limit))
+
+    def _index_order(self, rows, order_by):
+        # returns the rows of the sorted index of @order_by if all records (@rows is None) are
+        # considered and there is such an index, otherwise None
+        if order_by is None or rows is not None:
+            return None
+        sorted_index = self.indexes.get(order_by, {}).get('sorted')
+        return None if sorted_index is None else sorted_index.rows
+
+    def _records_satisfying(self, rows, residual, reverse=False):
+        # returns an iterator of the records at @rows (all records if None) which satisfy the conditions
+        # @residual, in the order of @rows (reversed if @reverse)
+        predicates = [self._make_predicate(condition) for condition in residual]
+        if rows is None:
+            records = reversed(self.records) if reverse else iter(self.records)
+        else:
+            records = map(self.records.__getitem__, reversed(rows) if reverse else rows)
+        if not predicates:
+            return records
+        return (record for record in records if all(predicate(record) for predicate in predicates))
         
     def _make_predicate(self, condition):
         column_name, predicate, extra_arg = condition
@@ -40,20 +220,199 @@ class Database:
         records_string = '\n'.join(map(str, self.records))
         return f'{types_str}\n{column_names_str}\n{records_string}'
     
+class Cursor:
+    # the lazy result of a query: the records of @database which satisfy @conditions (see
+    # parse_conditions_dict), ordered by the column @order_by if it is given, at most @limit of them.
+    # nothing is computed until the cursor is iterated or one of its methods is called
+
+    def __init__(self, database, conditions, order_by=None, limit=None):
+        if order_by is not None:
+            database.get_column_key(order_by) # the column must exist
+        if limit is not None and (type(limit) is not int or limit < 0):
+            raise ValueError(f'the limit must be a non-negative int, but was given {limit!r}')
+        self.database = database
+        self.conditions = conditions
+        self.order_by = order_by
+        self.limit = limit
+
+    def __iter__(self):
+        return self.database.generate_all_records_satisfying(self.conditions, self.order_by, self.limit)
+
+    def all(self):
+        return list(self)
+
+    def first(self):
+        # raises IndexError if there are no records
+        if self.limit == 0:
+            raise IndexError('no record satisfies the conditions')
+        return self.database.find_record(self.conditions, self.order_by)
+
+    def last(self):
+        # raises IndexError if there are no records
+        if self.limit is not None:
+            result = collections.deque(self, maxlen=1)
+            if not result:
+                raise IndexError('no record satisfies the conditions')
+            return result[0]
+        return self.database.find_record(self.conditions, self.order_by, last=True)
+
+    def count(self):
+        return self.database.count_records_satisfying(self.conditions, self.limit)
+
+# an index is built from the values of a column (in the order of the records) and answers
+# index.estimate(predicate_name, extra_arg), the number of rows (indexes of records) whose values
+# satisfy the predicate, or None if it cannot answer this predicate, and
+# index.lookup(predicate_name, extra_arg), the list of these rows (only called after estimate).
+# a row takes about this many bytes in an index
+ROW_SIZE = 36
+
+class HashIndex:
+    # answers eq. maps each value to the increasing list of its rows
+
+    def __init__(self, values):
+        self.rows = {}
+        for row, value in enumerate(values):
+            rows = self.rows.get(value)
+            if rows is None:
+                self.rows[value] = [row]
+            else:
+                rows.append(row)
+        # the index does not change, so its size is computed once
+        self._size = sys.getsizeof(self.rows) + sum(sys.getsizeof(rows) + ROW_SIZE * len(rows)
+                                                    for rows in self.rows.values())
+
+    def estimate(self, predicate_name, extra_arg):
+        if predicate_name != 'eq':
+            return None
+        try:
+            return len(self.rows.get(extra_arg, ()))
+        except TypeError: # unhashable, let the predicate decide
+            return None
+
+    def lookup(self, predicate_name, extra_arg):
+        return self.rows.get(extra_arg, [])
+
+    def estimated_size(self):
+        return self._size
+
+class SortedIndex:
+    # answers eq, gt and lt, and orders by the column. keeps the values in increasing order (ties in
+    # the order of the rows) and their rows in the same order
+
+    def __init__(self, values):
+        pairs = sorted(zip(values, itertools.count()))
+        self.keys = [value for value, row in pairs]
+        self.rows = [row for value, row in pairs]
+
+    def _bounds(self, predicate_name, extra_arg):
+        if predicate_name == 'eq':
+            return bisect.bisect_left(self.keys, extra_arg), bisect.bisect_right(self.keys, extra_arg)
+        if predicate_name == 'gt':
+            return bisect.bisect_right(self.keys, extra_arg), len(self.keys)
+        if predicate_name == 'lt':
+            return 0, bisect.bisect_left(self.keys, extra_arg)
+        return None
+
+    def estimate(self, predicate_name, extra_arg):
+        try:
+            bounds = self._bounds(predicate_name, extra_arg)
+        except TypeError: # not comparable with the values, let the predicate decide
+            return None
+        return None if bounds is None else bounds[1] - bounds[0]
+
+    def lookup(self, predicate_name, extra_arg):
+        start, stop = self._bounds(predicate_name, extra_arg)
+        return self.rows[start:stop]
+
+    def estimated_size(self):
+        return sys.getsizeof(self.keys) + sys.getsizeof(self.rows) + ROW_SIZE * len(self.rows)
+
+class _TrieNode:
+    __slots__ = ('children', 'rows', 'count')
+
+    def __init__(self):
+        self.children = {} # char -> _TrieNode
+        self.rows = [] # the rows of the values which end at this node
+        self.count = 0 # the number of rows of the values which pass through this node
+
+class PrefixTrie:
+    # answers startswith (with a single prefix) on a string column
+
+    def __init__(self, values):
+        self.root = _TrieNode()
+        self.nodes = 1
+        for row, value in enumerate(values):
+            node = self.root
+            node.count += 1
+            for char in value:
+                child = node.children.get(char)
+                if child is None:
+                    child = node.children[char] = _TrieNode()
+                    self.nodes += 1
+                node = child
+                node.count += 1
+            node.rows.append(row)
+
+    def _find(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def estimate(self, predicate_name, extra_arg):
+        if predicate_name != 'startswith' or not isinstance(extra_arg, str):
+            return None
+        node = self._find(extra_arg)
+        return 0 if node is None else node.count
+
+    def lookup(self, predicate_name, extra_arg):
+        node = self._find(extra_arg)
+        result = []
+        stack = [] if node is None else [node]
+        while stack:
+            node = stack.pop()
+            result.extend(node.rows)
+            stack.extend(node.children.values())
+        return result
+
+    def estimated_size(self):
+        return self.nodes * (sys.getsizeof(_TrieNode()) + sys.getsizeof({})) + ROW_SIZE * self.root.count
+
+INDEX_KINDS = {'hash': HashIndex, 'sorted': SortedIndex, 'trie': PrefixTrie}
+# an index lookup is intersected with the candidates only if it has at most this many times as many rows
+INTERSECTION_RATIO = 4
+
+NAMES_TO_PREDICATES = {'contains': str.__contains__,
+                       'startswith': str.startswith,
+                       'gt': operator.gt,
+                       'lt': operator.lt,
+                       'eq': operator.eq}
+PREDICATE_NAMES = {predicate: name for name, predicate in NAMES_TO_PREDICATES.items()}
+
+# tables are read in blocks of about this many bytes
+BLOCK_SIZE = 1 << 20
+# the default memory budget (in bytes) of the table cache
+TABLE_CACHE_BUDGET = 1 << 30
+# filter_database_parallel splits a table into this many partitions per process
+PARTITIONS_PER_WORKER = 4
+
 def filter_database(filename, order_by=None, **conditions_dict):
-    database = parse_database_from_file(filename)
-    conditions = parse_conditions_dict(conditions_dict)
-    if order_by is None:
-        return list(database.generate_all_records_satisfying(conditions))
-    return sorted(database.generate_all_records_satisfying(conditions),
-                  key=database.get_column_key(order_by))
+    database = load_table(filename)
+    return Cursor(database, parse_conditions_dict(conditions_dict), order_by).all()
+
+def query(filename, order_by=None, limit=None, **conditions_dict):
+    # like filter_database, but returns a Cursor, which finds the records as they are needed
+    database = load_table(filename)
+    return Cursor(database, parse_conditions_dict(conditions_dict), order_by, limit)
+
+def create_index(filename, column_name, kind='hash'):
+    # declares an index of kind @kind (see INDEX_KINDS) on the column @column_name of the table file
+    # @filename. the queries of the table use it from now on, also after the file changes
+    table_cache.declare_index(filename, column_name, kind)
 
 def parse_conditions_dict(conditions_dict):
-    names_to_predicates = {'contains': str.__contains__,
-                           'startswith': str.startswith,
-                           'gt': operator.gt,
-                           'lt': operator.lt,
-                           'eq': operator.eq}
     result = []
     for condition_str, extra_arg in conditions_dict.items():
         parts = condition_str.split('__', maxsplit=1)
@@ -61,34 +420,460 @@ def parse_conditions_dict(conditions_dict):
             column_name, predicate_name = condition_str, 'eq'
         else:
             column_name, predicate_name = parts
-        predicate = names_to_predicates.get(predicate_name)
+        predicate = NAMES_TO_PREDICATES.get(predicate_name)
         if predicate is None:
             raise ValueError(f'unable to parse the condition string "{condition_str}"; '
                              f'invalid predicate name: "{predicate_name}"')
         result.append((column_name, predicate, extra_arg))
     return result
 
-def parse_database_from_file(filename):
+def parse_database_from_file(filename, columnar=False):
+    # if @columnar, the records are kept in ColumnarRecords instead of a list of tuples
     with open(filename) as f:
         lines = [line[:-1] for line in f.readlines() if not line.isspace()]
     if len(lines) < 2:
         raise ValueError(f'"{filename}" must have atleast 2 non-blank lines')
-    column_types = parse_column_types(lines[0])
-    column_names = tokenize_line(lines[1])
-    number_of_columns = len(column_names)
-    if len(column_types) != number_of_columns:
+    column_types, column_names = parse_header(filename, lines[0], lines[1])
+    columns = parse_columns(itertools.islice(lines, 2, len(lines)), column_types)
+    if columnar:
+        records = ColumnarRecords(column_types, columns)
+    else:
+        records = list(zip(*columns))
+    return Database(column_types, column_names, records)
+
+def parse_header(filename, types_line, names_line):
+    # returns the (column_types, column_names) pair described by the first two lines of a table
+    column_types = parse_column_types(types_line)
+    column_names = tokenize_line(names_line)
+    if len(column_types) != len(column_names):
         raise ValueError(f'unable to parse {filename}: '
                          f'the number of types (given {len(column_types)}) '
                          f'must match the number of columns (given len(column_names))')
-    records = []
-    for line in itertools.islice(lines, 2, len(lines)):
-        tokens = tokenize_line(line)
+    return column_types, column_names
+
+def parse_records(lines, column_types):
+    # returns the list of records described by the data lines @lines (without newlines)
+    return list(zip(*parse_columns(lines, column_types)))
+
+def parse_columns(lines, column_types):
+    # returns the columns (lists of values) of the records described by the data lines @lines
+    # the lines are tokenized in bulk: runs of lines without double quotes are joined and split at once
+    # (only lines with double quotes go through tokenize_line), and then each column is converted
+    # to its type at once. if some line cannot be parsed, the same error is raised as when parsing
+    # the lines one by one: the error of the first bad line.
+    lines = list(lines)
+    number_of_columns = len(column_types)
+    all_lines = range(len(lines))
+    has_quotes = list(map(str.__contains__, lines, itertools.repeat('"')))
+    comma_counts = map(str.count, lines, itertools.repeat(','))
+
+    # find the first bad line; only the lines before it are converted
+    bad_line_i = len(lines)
+    error = None
+    for i in itertools.compress(all_lines, map(operator.ne, comma_counts, itertools.repeat(number_of_columns - 1))):
+        if not has_quotes[i]:
+            bad_line_i = i
+            error = _wrong_token_count_error(lines[i], lines[i].count(',') + 1, number_of_columns)
+            break
+    quoted_tokens = {}
+    for i in itertools.compress(all_lines, has_quotes):
+        if i >= bad_line_i:
+            break
+        try:
+            tokens = tokenize_line(lines[i])
+        except ValueError as e:
+            bad_line_i, error = i, e
+            break
         if len(tokens) != number_of_columns:
-            raise ValueError(f'unable to parse the line "{line}". it has {len(tokens)} tokens, but '
-                             f'the number of columns is {number_of_columns}')
-        records.append(tuple(data_type(token) for data_type, token in zip(column_types, tokens)))
+            bad_line_i, error = i, _wrong_token_count_error(lines[i], len(tokens), number_of_columns)
+            break
+        quoted_tokens[i] = tokens
+
+    tokens = []
+    run_start = 0
+    for i in itertools.chain(quoted_tokens, [bad_line_i]):
+        if run_start < i:
+            tokens.extend(','.join(lines[run_start:i]).split(','))
+        if i < bad_line_i:
+            tokens.extend(quoted_tokens[i])
+        run_start = i + 1
+
+    try:
+        columns = []
+        for i, data_type in enumerate(column_types):
+            column = tokens[i::number_of_columns]
+            columns.append(column if data_type is str else list(map(data_type, column)))
+    except ValueError:
+        # convert the records one by one, to raise the error of the first bad one
+        for i in range(0, len(tokens), number_of_columns):
+            tuple(data_type(token) for data_type, token in zip(column_types, tokens[i:i + number_of_columns]))
+        raise
+    if error is not None:
+        raise error
+    return columns
+
+def _wrong_token_count_error(line, number_of_tokens, number_of_columns):
+    return ValueError(f'unable to parse the line "{line}". it has {number_of_tokens} tokens, but '
+                      f'the number of columns is {number_of_columns}')
+
+def split_lines(f, start, size, block_size):
+    # returns the byte offsets [start, b1, ..., @size] which split the bytes [@start, @size) of the binary
+    # file @f into blocks of about @block_size bytes, each of which ends with a newline (or the end)
+    bounds = [start]
+    while bounds[-1] < size:
+        f.seek(min(bounds[-1] + block_size, size) - 1)
+        line = f.readline()
+        bounds.append(f.tell() if line and f.tell() < size else size)
+    return bounds
+
+def parse_block(data, column_types, encoding):
+    # returns the records of the data lines in the bytes @data, which consists of whole lines
+    text = str(data, encoding)
+    lines = (line[:-1] if line.endswith('\r') else line for line in text.split('\n'))
+    return parse_records((line for line in lines if line and not line.isspace()), column_types)
+
+class LazyRecords:
+    # the records of a table file, which is read and tokenized lazily, a block at a time.
+    # it is a sequence, but only the blocks up to the records which are accessed get tokenized.
+    # representation:
+    # self._file is the table file, open in binary mode, and self._version is its (mtime, size)
+    #     when it was loaded. a block is read with os.pread, and only while the file still has this
+    #     version, so a file changed after it was loaded raises a ValueError instead of giving
+    #     records from another version. the file is closed once every block is tokenized.
+    # self._bounds are the byte offsets of the blocks in the file: block i is [bounds[i], bounds[i + 1]).
+    #     the first block begins after the header and every block ends with a newline (or the file).
+    # self._blocks[i] is the list of records of block i, or None if it was not tokenized yet.
+    #     blocks are tokenized in order, so the tokenized blocks are a prefix of self._blocks.
+    # self._starts[i] is the index of the first record of block i, for the tokenized blocks
+    #     and the one after them.
+
+    def __init__(self, f, data_start, column_types, block_size=BLOCK_SIZE):
+        self._file = f
+        stat = os.fstat(f.fileno())
+        self._version = (stat.st_mtime_ns, stat.st_size)
+        self._column_types = column_types
+        self._encoding = locale.getpreferredencoding(False)
+        self._bounds = split_lines(f, data_start, stat.st_size, block_size)
+        self._blocks = [None] * (len(self._bounds) - 1)
+        self._starts = [0]
+        self.tokenized_bytes = 0
+        self.tokenized_records = 0
+        if not self._blocks:
+            f.close()
+
+    def _read_block(self, start, end):
+        # returns the bytes [@start, @end) of the file
+        stat = os.fstat(self._file.fileno())
+        if (stat.st_mtime_ns, stat.st_size) == self._version:
+            data = os.pread(self._file.fileno(), end - start, start)
+            if len(data) == end - start:
+                return data
+        raise ValueError(f'the table file "{self._file.name}" changed after it was loaded')
+
+    def _tokenize_next_block(self):
+        # tokenizes the first block which is not tokenized; returns False if there is none
+        i = len(self._starts) - 1
+        if i == len(self._blocks):
+            return False
+        start, end = self._bounds[i], self._bounds[i + 1]
+        block = parse_block(self._read_block(start, end), self._column_types, self._encoding)
+        self._blocks[i] = block
+        self._starts.append(self._starts[-1] + len(block))
+        self.tokenized_bytes += end - start
+        self.tokenized_records += len(block)
+        if i + 1 == len(self._blocks):
+            self._file.close()
+        return True
+
+    def __iter__(self):
+        for i in range(len(self._blocks)):
+            if self._blocks[i] is None:
+                self._tokenize_next_block()
+            yield from self._blocks[i]
+
+    def __len__(self):
+        while self._tokenize_next_block():
+            pass
+        return self._starts[-1]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        while index >= self._starts[-1] and self._tokenize_next_block():
+            pass
+        if not 0 <= index < self._starts[-1]:
+            raise IndexError('record index out of range')
+        block_i = bisect.bisect_right(self._starts, index) - 1
+        return self._blocks[block_i][index - self._starts[block_i]]
+
+    def estimated_size(self):
+        # returns an estimate of the memory used by the tokenized records (in bytes),
+        # whose size is estimated from the first one
+        if not self.tokenized_records:
+            return 0
+        first = self._blocks[0][0] if self._blocks[0] else next(iter(self), ())
+        record_size = sys.getsizeof(first) + sum(sys.getsizeof(value) for value in first)
+        return record_size * self.tokenized_records
+
+class IntColumn:
+    # the values of an int column, in an array('q'), or in a list if some value does not fit in 64 bits
+
+    def __init__(self, values):
+        if not isinstance(values, list):
+            values = list(values)
+        try:
+            self.values = array('q', values)
+            self._size = None
+        except OverflowError:
+            self.values = values
+            self._size = sys.getsizeof(values) + sum(map(sys.getsizeof, values))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, i):
+        return self.values[i]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __reversed__(self):
+        return reversed(self.values)
+
+    def select(self, predicate_name, extra_arg, rows=None):
+        # returns the list of the rows (of @rows if given, otherwise of all rows, in the same order) whose
+        # values satisfy the predicate, or None if it cannot be compared in bulk
+        if type(extra_arg) is not int or predicate_name not in INT_COMPARISONS:
+            return None
+        if (rows is None and numpy is not None and type(self.values) is array
+                and INT64_MIN <= extra_arg <= INT64_MAX):
+            mask = INT_COMPARISONS[predicate_name](numpy.frombuffer(self.values, dtype=numpy.int64), extra_arg)
+            return numpy.flatnonzero(mask).tolist()
+        # the comparison with the value on the right side, as a method of @extra_arg
+        test = getattr(extra_arg, INT_REFLECTED_COMPARISONS[predicate_name])
+        if rows is None:
+            return list(itertools.compress(itertools.count(), map(test, self.values)))
+        return list(itertools.compress(rows, map(test, map(self.values.__getitem__, rows))))
+
+    def estimated_size(self):
+        if type(self.values) is array:
+            return sys.getsizeof(self.values)
+        return self._size
+
+class StrColumn:
+    # the values of a string column, dictionary-encoded: self.codes[i] is the code of the value of row i,
+    # and the value with code c is self.text[self.offsets[c]:self.offsets[c + 1]]
+    # (the distinct values are concatenated in self.text, so they take no space as separate objects)
+
+    def __init__(self, values):
+        if not isinstance(values, list):
+            values = list(values)
+        distinct = list(dict.fromkeys(values))
+        codes = {value: code for code, value in enumerate(distinct)}
+        self.codes = array('l', map(codes.__getitem__, values))
+        self.text = ''.join(distinct)
+        self.offsets = array('q', itertools.accumulate(map(len, distinct), initial=0))
+
+    def dictionary(self):
+        # returns the list of the distinct values, indexed by code
+        return [self.text[start:end] for start, end in zip(self.offsets, itertools.islice(self.offsets, 1, None))]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        code = self.codes[i]
+        return self.text[self.offsets[code]:self.offsets[code + 1]]
+
+    def __iter__(self):
+        return map(self.dictionary().__getitem__, self.codes)
+
+    def __reversed__(self):
+        return map(self.dictionary().__getitem__, reversed(self.codes))
+
+    def select(self, predicate_name, extra_arg, rows=None):
+        # like IntColumn.select. the predicate is evaluated once per distinct value and the rows are
+        # selected by their codes
+        predicate = NAMES_TO_PREDICATES.get(predicate_name)
+        if predicate is None:
+            return None
+        try:
+            matching = {code for code, value in enumerate(self.dictionary()) if predicate(value, extra_arg)}
+        except TypeError: # let the predicate raise it for the first record
+            return None
+        if len(matching) == 1:
+            test = matching.pop().__eq__
+        else:
+            test = matching.__contains__
+        if rows is None:
+            return list(itertools.compress(itertools.count(), map(test, self.codes)))
+        return list(itertools.compress(rows, map(test, map(self.codes.__getitem__, rows))))
+
+    def estimated_size(self):
+        return sys.getsizeof(self.codes) + sys.getsizeof(self.text) + sys.getsizeof(self.offsets)
+
+class ColumnarRecords:
+    # the records of a table kept by column (see IntColumn and StrColumn) instead of as tuples.
+    # it is a sequence of record tuples, which are made when they are accessed, and it can also
+    # select the rows which satisfy a condition on a column in bulk (see select)
+
+    def __init__(self, column_types, columns):
+        # @columns are iterables of the values of each column
+        self.columns = [IntColumn(values) if data_type is int else StrColumn(values)
+                        for data_type, values in zip(column_types, columns)]
+        self._length = len(self.columns[0]) if self.columns else 0
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return zip(*self.columns)
+
+    def __reversed__(self):
+        return zip(*map(reversed, self.columns))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(self._length))]
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError('record index out of range')
+        return tuple(column[key] for column in self.columns)
+
+    def select(self, coli, predicate_name, extra_arg, rows=None):
+        # returns the list of the rows (of @rows if given, otherwise of all rows, in the same order) whose
+        # values in column @coli satisfy the predicate, or None if it cannot be evaluated in bulk
+        return self.columns[coli].select(predicate_name, extra_arg, rows)
+
+    def estimated_size(self):
+        return sum(column.estimated_size() for column in self.columns)
+
+# the int comparisons which are evaluated in bulk: as numpy ufuncs, and as the method of the
+# compared int which gives the same result (extra_arg < value is value > extra_arg)
+INT_COMPARISONS = {'eq': operator.eq, 'gt': operator.gt, 'lt': operator.lt}
+INT_REFLECTED_COMPARISONS = {'eq': '__eq__', 'gt': '__lt__', 'lt': '__gt__'}
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+def load_database(filename, columnar=False):
+    # returns the Database of the table file @filename, like parse_database_from_file,
+    # but its records are read and tokenized only when they are accessed (see LazyRecords).
+    # errors in the header are raised here, errors in records when they are reached.
+    # if @columnar, all records are tokenized here and kept in ColumnarRecords
+    f = open(filename, 'rb')
+    try:
+        column_types, column_names, data_start = read_table_header(filename, f)
+        records = LazyRecords(f, data_start, column_types)
+        if columnar:
+            records = ColumnarRecords(column_types, (map(operator.itemgetter(i), records)
+                                                     for i in range(len(column_types))))
+    except ValueError:
+        f.close()
+        raise
     return Database(column_types, column_names, records)
 
+def read_table_header(filename, f):
+    # parses the header of the table file @filename from @f, the file open in binary mode
+    # returns (column_types, column_names, the byte offset of the data lines)
+    encoding = locale.getpreferredencoding(False)
+    header = []
+    while len(header) < 2:
+        line = f.readline()
+        if not line:
+            raise ValueError(f'"{filename}" must have atleast 2 non-blank lines')
+        line = str(line, encoding).rstrip('\r\n')
+        if line and not line.isspace():
+            header.append(line)
+    column_types, column_names = parse_header(filename, *header)
+    return column_types, column_names, f.tell()
+
+def filter_database_parallel(filename, workers, order_by=None, **conditions_dict):
+    # returns the same as filter_database(@filename, @order_by, **@conditions_dict) (and raises the same
+    # errors), but without the table cache: the data lines are split into partitions which end with
+    # newlines, and a pool of @workers processes tokenizes and filters them. the results of the
+    # partitions are concatenated or, for @order_by, each partition is sorted and they are merged.
+    with open(filename, 'rb') as f:
+        column_types, column_names, data_start = read_table_header(filename, f)
+        # check the conditions and the order before starting the pool
+        conditions = parse_conditions_dict(conditions_dict)
+        header = Database(column_types, column_names, [])
+        header.plan(conditions)
+        key = None if order_by is None else header.get_column_key(order_by)
+        partitions = workers * PARTITIONS_PER_WORKER
+        size = os.fstat(f.fileno()).st_size
+        bounds = split_lines(f, data_start, size, max(1, -(-(size - data_start) // partitions)))
+    with ProcessPoolExecutor(workers) as executor:
+        runs = list(executor.map(_filter_partition, itertools.repeat(filename), bounds[:-1], bounds[1:],
+                                 itertools.repeat(column_types), itertools.repeat(column_names),
+                                 itertools.repeat(conditions_dict), itertools.repeat(order_by)))
+    if key is None:
+        return list(itertools.chain.from_iterable(runs))
+    return list(heapq.merge(*runs, key=key))
+
+def _filter_partition(filename, start, end, column_types, column_names, conditions_dict, order_by):
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    database = Database(column_types, column_names,
+                        parse_block(data, column_types, locale.getpreferredencoding(False)))
+    return list(database.generate_all_records_satisfying(parse_conditions_dict(conditions_dict), order_by))
+
+class TableCache:
+    # keeps the Databases of recently used table files, so that they are parsed once.
+    # an entry is used only while its file has the same modification time and size.
+    # when the estimated memory of the entries exceeds @memory_budget bytes, the least recently
+    # used entries are dropped (the most recent one is always kept).
+    # if @columnar, the tables are loaded with ColumnarRecords (see load_database)
+
+    def __init__(self, memory_budget=TABLE_CACHE_BUDGET, columnar=False):
+        self.memory_budget = memory_budget
+        self.columnar = columnar
+        self._entries = collections.OrderedDict() # path -> ((mtime, size), database)
+        self._index_kinds = {} # path -> [(column name, index kind)], built on every load of the path
+
+    def get(self, filename):
+        # returns the Database of the table file @filename
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(path)
+            database = entry[1]
+        else:
+            database = load_database(path, self.columnar)
+            for column_name, kind in self._index_kinds.get(path, ()):
+                database.create_index(column_name, kind)
+            self._entries[path] = (version, database)
+            self._entries.move_to_end(path)
+        self._evict()
+        return database
+
+    def declare_index(self, filename, column_name, kind):
+        # makes every Database of the table file @filename have the index (@column_name, @kind)
+        path = os.path.abspath(filename)
+        self.get(path).create_index(column_name, kind)
+        index_kinds = self._index_kinds.setdefault(path, [])
+        if (column_name, kind) not in index_kinds:
+            index_kinds.append((column_name, kind))
+        self._evict()
+
+    def clear(self):
+        self._entries.clear()
+
+    def _evict(self):
+        total = sum(database.estimated_size() for version, database in self._entries.values())
+        while total > self.memory_budget and len(self._entries) > 1:
+            version, database = self._entries.popitem(last=False)[1]
+            total -= database.estimated_size()
+
+table_cache = TableCache()
+
+def load_table(filename):
+    # returns the Database of the table file @filename from table_cache
+    return table_cache.get(filename)
 
 def parse_column_types(line):
     type_names_to_converters = {'int': int, 'integer': int, 'string': str, 'str': str}    
@@ -103,35 +888,37 @@ def parse_column_types(line):
     return result
 
 def tokenize_line(line):
+    # splits @line at the commas which are not between double quotes and removes the double quotes
+    # lines without double quotes are simply split; otherwise, the parts between double quotes are
+    # the odd ones of line.split('"'), and only the even ones are split at commas
     if not line:
         raise ValueError('cannot tokenize the empty line')
-    result = []
-    current_token_chars = []
-    in_double_quotes = False
-    for char in line:
-        if char == ',':
-            if in_double_quotes:
-                current_token_chars.append(char)
-            else:
-                result.append(''.join(current_token_chars))
-                current_token_chars = []
-        elif char == '"':
-            in_double_quotes = not in_double_quotes
-        else:
-            current_token_chars.append(char)            
-    if in_double_quotes:
+    if '"' not in line:
+        return line.split(',')
+    parts = line.split('"')
+    if len(parts) % 2 == 0:
         raise ValueError(f'could not parse the line "{line}". missing closing double quote')
-    result.append(''.join(current_token_chars))
+    result = ['']
+    for i, part in enumerate(parts):
+        if i % 2:
+            result[-1] += part
+        else:
+            first_piece, *pieces = part.split(',')
+            result[-1] += first_piece
+            result.extend(pieces)
     return result
 
-def first(*args, **kwargs):
-    return filter_database(*args, **kwargs)[0]
+def first(filename, order_by=None, **conditions_dict):
+    database = load_table(filename)
+    return Cursor(database, parse_conditions_dict(conditions_dict), order_by).first()
 
-def last(*args, **kwargs):
-    return filter_database(*args, **kwargs)[-1]
+def last(filename, order_by=None, **conditions_dict):
+    database = load_table(filename)
+    return Cursor(database, parse_conditions_dict(conditions_dict), order_by).last()
 
-def count(*args, **kwargs):
-    return len(filter_database(*args, **kwargs))
+def count(filename, order_by=None, **conditions_dict):
+    database = load_table(filename)
+    return Cursor(database, parse_conditions_dict(conditions_dict), order_by).count()
 
 def pl(l):
     for x in l:
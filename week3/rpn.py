@@ -1,6 +1,12 @@
 from fractions import Fraction
 import operator
+import functools
+import itertools
 import math
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 operators = {'+': {'arity': 2, 'exec_proc': operator.add},
              '-': {'arity': 2, 'exec_proc': operator.sub},
@@ -16,12 +22,330 @@ operators = {'+': {'arity': 2, 'exec_proc': operator.add},
 
 data_types = [int, float, Fraction, complex, str]
 
+# the operations whose exec_proc is a python operator are compiled to it
+infix_symbols = {operator.add: '+',
+                 operator.sub: '-',
+                 operator.mul: '*',
+                 operator.floordiv: '//',
+                 operator.truediv: '/',
+                 operator.pow: '**'}
+
+# the number of compiled programs which compile_rpn keeps
+PROGRAM_CACHE_SIZE = 1024
+
+# the names of the numpy functions which compute the exec_proc of an operation element-wise
+numpy_functions = {operator.add: 'add',
+                   operator.sub: 'subtract',
+                   operator.mul: 'multiply',
+                   operator.floordiv: 'floor_divide',
+                   operator.truediv: 'true_divide',
+                   operator.pow: 'power',
+                   math.sqrt: 'sqrt',
+                   min: 'minimum',
+                   max: 'maximum',
+                   abs: 'absolute'}
+
 def rpn_calc(expr_str):
     try:
         return evaluate_expr(parse(expr_str))
     except ValueError as ve:
         raise ValueError(f'cannot calculate "{expr_str}" in rpn: {ve}')
 
+class Program:
+    # a compiled rpn expression (see compile_rpn).
+    # self.variables are the names of its variables, in the order of their first appearance
+    # self.source is the python code of the function which evaluates it
+    # self.dag is the optimized ExpressionDag of the expression, which the function computes
+
+    def __init__(self, expr_str, variables, source, function, dag):
+        self.expr_str = expr_str
+        self.variables = variables
+        self.source = source
+        self._function = function
+        self.dag = dag
+
+    def evaluate(self, **values):
+        # returns the value of the expression when its variables have @values
+        # a ValueError is raised if a variable has no value, if a value is given for something
+        # which is not a variable, or if some operation raises it
+        try:
+            args = [values[name] for name in self.variables]
+        except KeyError as e:
+            raise ValueError(f'cannot calculate "{self.expr_str}" in rpn: no value for the variable {e}')
+        if len(values) != len(self.variables):
+            unknown = ', '.join(name for name in values if name not in self.variables)
+            raise ValueError(f'cannot calculate "{self.expr_str}" in rpn: {unknown} are not variables')
+        try:
+            return self._function(*args)
+        except ValueError as ve:
+            raise ValueError(f'cannot calculate "{self.expr_str}" in rpn: {ve}')
+
+    def evaluate_batch(self, columns, length=None):
+        # returns the column of the values of the expression for each row of @columns, which maps
+        # each variable to the column (a sequence: list, array or numpy array) of its values.
+        # @length is the number of rows, needed only if the expression has no variables.
+        # each operation is applied to whole columns: with numpy, when it is installed and all the
+        # columns are finite float arrays (the result is then a numpy array; if some operation
+        # overflows, divides by zero or is invalid, the columns are evaluated without numpy),
+        # otherwise with map over the columns (the result is a list). values of any type work
+        # this way (Fraction, complex, str). if an operation raises, the rows are evaluated one
+        # by one, so that the error is that of the first row, as with evaluate.
+        unknown = [name for name in columns if name not in self.variables]
+        missing = [name for name in self.variables if name not in columns]
+        if unknown or missing:
+            raise ValueError(f'cannot calculate "{self.expr_str}" in rpn: the columns must be those of '
+                             f'the variables {", ".join(self.variables)}')
+        columns = [columns[name] for name in self.variables]
+        lengths = {len(column) for column in columns} | ({length} if length is not None else set())
+        if len(lengths) > 1:
+            raise ValueError(f'cannot calculate "{self.expr_str}" in rpn: the columns must have the same length')
+        if not lengths:
+            raise ValueError(f'cannot calculate "{self.expr_str}" in rpn: the length of a batch '
+                             f'without variables must be given')
+        length = lengths.pop()
+        if numpy is not None and self._can_use_numpy(columns):
+            try:
+                with numpy.errstate(all='raise'):
+                    result = self._evaluate_columns(columns, _numpy_operation)
+                return result if isinstance(result, numpy.ndarray) else numpy.full(length, result)
+            except FloatingPointError:
+                pass
+        # the values of the stack which are lists are columns
+        columns = [column.tolist() if numpy is not None and isinstance(column, numpy.ndarray) else list(column)
+                   for column in columns]
+        try:
+            result = self._evaluate_columns(columns, _map_operation)
+        except Exception:
+            return [self.evaluate(**dict(zip(self.variables, row))) for row in zip(*columns)]
+        return result if type(result) is list else [result] * length
+
+    def _can_use_numpy(self, columns):
+        if not columns:
+            return False
+        for column in columns:
+            if not (isinstance(column, numpy.ndarray) and column.dtype.kind == 'f'
+                    and numpy.isfinite(column).all()):
+                return False
+        for node in self.dag.nodes:
+            if node[0] == 'value' and type(node[1]) not in (int, float):
+                return False
+            if node[0] == 'operation' and node[1]['exec_proc'] not in numpy_functions:
+                return False
+        return True
+
+    def _evaluate_columns(self, columns, make_operation):
+        # evaluates the nodes of self.dag, whose values are the @columns or constants.
+        # make_operation(operation) returns the function which applies the operation to such values
+        columns_by_name = dict(zip(self.variables, columns))
+        results = []
+        for node in self.dag.nodes:
+            if node[0] == 'value':
+                results.append(node[1])
+            elif node[0] == 'variable':
+                results.append(columns_by_name[node[1]])
+            else:
+                results.append(make_operation(node[1])(*map(results.__getitem__, node[2])))
+        return results[-1]
+
+def _map_operation(operation):
+    # the function which applies @operation to lists (element-wise) and constants
+    exec_proc = operation['exec_proc']
+    def apply(*args):
+        if all(type(arg) is not list for arg in args):
+            return exec_proc(*args)
+        return list(map(exec_proc, *(arg if type(arg) is list else itertools.repeat(arg) for arg in args)))
+    return apply
+
+def _numpy_operation(operation):
+    # the function which applies @operation to numpy arrays (element-wise) and constants
+    function = getattr(numpy, numpy_functions[operation['exec_proc']])
+    if operation['arity'] > 2: # min3
+        return lambda *args: functools.reduce(function, args)
+    return function
+
+@functools.lru_cache(maxsize=PROGRAM_CACHE_SIZE)
+def compile_rpn(expr_str):
+    # returns the Program of @expr_str, in which the tokens which are identifiers, but not numbers
+    # or operations, are variables (rpn_calc takes them as strings). the expression is checked
+    # like evaluate_expr does, so evaluating the program only calls the operations, and it is
+    # optimized (see optimize), so each distinct operation of it is computed once.
+    # the programs of the last PROGRAM_CACHE_SIZE expressions are cached.
+    try:
+        expr = parse(expr_str)
+        variables = {token for token, item in zip(expr_str.split(), expr)
+                     if type(item) is str and token.isidentifier()}
+        dag = optimize(expr, variables)
+    except ValueError as ve:
+        raise ValueError(f'cannot calculate "{expr_str}" in rpn: {ve}')
+    # the function is written as one assignment per operation node. the nodes are named after
+    # the variables (v<i>), the constants (c<i>) and the results of the operations (t<i>)
+    namespace = {}
+    variables = {}
+    lines = []
+    names = []
+    for node in dag.nodes:
+        if node[0] == 'operation':
+            operation, args = node[1], [names[arg] for arg in node[2]]
+            symbol = infix_symbols.get(operation['exec_proc']) if len(args) == 2 else None
+            if symbol is None:
+                name = f'f{len(namespace)}'
+                namespace[name] = operation['exec_proc']
+                value = f'{name}({", ".join(args)})'
+            else:
+                value = f'{args[0]} {symbol} {args[1]}'
+            names.append(f't{len(lines)}')
+            lines.append(f'    {names[-1]} = {value}\n')
+        elif node[0] == 'variable':
+            names.append(f'v{variables.setdefault(node[1], len(variables))}')
+        else:
+            name = f'c{len(namespace)}'
+            namespace[name] = node[1]
+            names.append(name)
+    source = (f'def program({", ".join(f"v{i}" for i in range(len(variables)))}):\n'
+              + ''.join(lines)
+              + f'    return {names[-1]}\n')
+    exec(compile(source, f'<rpn "{expr_str}">', 'exec'), namespace)
+    return Program(expr_str, tuple(variables), source, namespace['program'], dag)
+
+class ExpressionDag:
+    # the directed acyclic graph of an expression, in which equal sub-expressions are one node.
+    # self.nodes are in an order in which the arguments of a node come before it, and the last
+    # node is the value of the expression. a node is one of:
+    #   ('value', value)
+    #   ('variable', name)
+    #   ('operation', operation, (the indexes of the nodes of its arguments))
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def evaluate(self, **values):
+        # returns the value of the expression when its variables have @values
+        # a ValueError is raised if a variable has no value
+        results = []
+        for node in self.nodes:
+            if node[0] == 'value':
+                results.append(node[1])
+            elif node[0] == 'variable':
+                if node[1] not in values:
+                    raise ValueError(f'no value for the variable "{node[1]}"')
+                results.append(values[node[1]])
+            else:
+                results.append(node[1]['exec_proc'](*map(results.__getitem__, node[2])))
+        return results[-1]
+
+    def to_expr(self):
+        # returns the expression (a list of items, like parse returns) which the dag computes, in
+        # which the shared nodes are repeated. variables are the strings of their names, so
+        # evaluate_expr can evaluate it when there are none
+        exprs = []
+        for node in self.nodes:
+            if node[0] == 'operation':
+                exprs.append([item for arg in node[2] for item in exprs[arg]] + [node[1]])
+            else:
+                exprs.append([node[1]])
+        return exprs[-1]
+
+    def export(self):
+        # returns the nodes, in which operations are (name of the operation, indexes of the arguments)
+        names = {id(operation): name for name, operation in operators.items()}
+        return [(names[id(node[1])], node[2]) if node[0] == 'operation' else node for node in self.nodes]
+
+    def __str__(self):
+        lines = []
+        for i, node in enumerate(self.export()):
+            if node[0] == 'value':
+                lines.append(f'n{i} = {node[1]!r}')
+            elif node[0] == 'variable':
+                lines.append(f'n{i} = {node[1]}')
+            else:
+                lines.append(f'n{i} = {node[0]} {" ".join(f"n{arg}" for arg in node[1])}')
+        return '\n'.join(lines)
+
+def optimize(expr, variables=()):
+    # returns the ExpressionDag of @expr, in which the strings in @variables are variables.
+    # the ValueErrors of evaluate_expr are raised if @expr is not a valid expression.
+    # the operations whose arguments are all values are computed (constant folding), except those
+    # which raise an error, which is left for the evaluation. equal nodes are made once: values of
+    # the same type and representation, and the same operations of the same nodes
+    check_arities(expr)
+    nodes = []
+    indexes = {} # the key of a node -> its index in nodes
+    stack = []
+    def add(node, key):
+        index = indexes.get(key)
+        if index is None:
+            index = indexes[key] = len(nodes)
+            nodes.append(node)
+        stack.append(index)
+    for item in expr:
+        if not is_operation(item):
+            if type(item) is str and item in variables:
+                add(('variable', item), ('variable', item))
+            else:
+                add(('value', item), _value_key(item))
+            continue
+        args = tuple(stack[len(stack) - item['arity']:])
+        del stack[len(stack) - item['arity']:]
+        if all(nodes[arg][0] == 'value' for arg in args):
+            try:
+                value = item['exec_proc'](*(nodes[arg][1] for arg in args))
+            except Exception:
+                pass
+            else:
+                add(('value', value), _value_key(value))
+                continue
+        add(('operation', item, args), ('operation', id(item), args))
+    # drop the nodes which the result does not need (the arguments of folded operations)
+    needed = [False] * len(nodes)
+    needed[stack[0]] = True
+    for i in range(stack[0], -1, -1):
+        if needed[i] and nodes[i][0] == 'operation':
+            for arg in nodes[i][2]:
+                needed[arg] = True
+    new_indexes = list(itertools.accumulate(needed, initial=0))
+    result = []
+    for node, is_needed in zip(nodes, needed):
+        if is_needed:
+            if node[0] == 'operation':
+                node = (node[0], node[1], tuple(new_indexes[arg] for arg in node[2]))
+            result.append(node)
+    return ExpressionDag(result)
+
+def _value_key(value):
+    # floats and complex numbers are told apart by their representations (0.0 and -0.0 are equal)
+    if type(value) in (float, complex):
+        return ('value', type(value), repr(value))
+    return ('value', type(value), value)
+
+def check_arities(expr):
+    # raises the ValueError which evaluate_expr raises for @expr when the numbers of items do not
+    # fit the arities of the operations (and for the empty expression). otherwise @expr is a valid
+    # postfix expression.
+    if expression_start(expr) > 0:
+        raise ValueError(' too many items.')
+
+def expression_start(expr):
+    # returns the index of the first item of the expression at the end of @expr, which is all of
+    # @expr (the index is 0) unless @expr has too many items. raises the other ValueErrors of
+    # evaluate_expr for @expr (and one for the empty expression).
+    # @expr is scanned from the end: @needed is the number of values which are still needed to
+    # complete the expression, each operation needs its arguments instead of its value.
+    if not expr:
+        raise ValueError('cannot evaluate the empty expression')
+    if len(expr) == 1:
+        if is_operation(expr[0]):
+            raise ValueError('cannot evaluate an expression consisting only of an operation')
+        return 0
+    if not is_operation(expr[-1]):
+        raise ValueError('every expression with more than 1 items must end with an operation')
+    needed = 1
+    for i in range(len(expr) - 1, -1, -1):
+        item = expr[i]
+        needed += item['arity'] - 1 if is_operation(item) else -1
+        if needed == 0:
+            return i
+    raise ValueError('not enough items.')
+
 def iterator_is_empty(iterator):
     # returns True only if iterator is empty (calling next on it would raise StopIteration)
     # if iterator is not empty, it is forwarded by one element
@@ -36,40 +360,29 @@ def iterator_is_empty(iterator):
 def evaluate_expr(expr):
     # returns the value of @expr
     # a ValueError is raised if evaluating @expr is not possible
-    
-    if len(expr) == 1:
-        if is_operation(expr[0]):
-            raise ValueError('cannot evaluate an expression consisting only of an operation')
-        return expr[0]
-    if not is_operation(expr[-1]):
-        raise ValueError('every expression with more than 1 items must end with an operation')
-    
-    operations_stack = []
-    reversed_expr_iter = reversed(expr)
-    for item in reversed_expr_iter:
-        if is_operation(item):
-            operations_stack.append({'op': item, 'stack': []})
+    # the items of the expression are found first (see expression_start), and then evaluated from
+    # left to right with a stack of values: an operation replaces the values of its arguments with
+    # its result. if items are left before the expression, its value is still computed (so the errors
+    # of its operations come first), and then " too many items." is raised
+
+    start = expression_start(expr)
+    stack = []
+    push, pop = stack.append, stack.pop
+    for item in itertools.islice(expr, start, None):
+        if type(item) is not dict: # not is_operation(item)
+            push(item)
+        elif item['arity'] == 2:
+            right = pop()
+            push(item['exec_proc'](pop(), right))
+        elif item['arity'] == 1:
+            push(item['exec_proc'](pop()))
         else:
-            current_sub_stack = operations_stack[-1]['stack']
-            current_operation = operations_stack[-1]['op']
-            
-            current_sub_stack.append(item)
-            
-            # squeeze the operations_stack as much as possible
-            while len(current_sub_stack) == current_operation['arity']:
-                latest_value = eval_operation(current_operation, reversed(current_sub_stack))
-                operations_stack.pop()
-                if not operations_stack:
-                    break
-                current_sub_stack = operations_stack[-1]['stack']
-                current_operation = operations_stack[-1]['op']
-                current_sub_stack.append(latest_value)
-                
-            if not operations_stack: # squeezed to the end
-                if not iterator_is_empty(reversed_expr_iter):
-                    raise ValueError(' too many items.')
-                return latest_value
-    raise ValueError('not enough items.')
+            args = stack[len(stack) - item['arity']:]
+            del stack[len(stack) - item['arity']:]
+            push(item['exec_proc'](*args))
+    if start > 0:
+        raise ValueError(' too many items.')
+    return stack[0]
                             
 def is_operation(x):
     # x must be either an operation or a number
@@ -1,5 +1,5 @@
 import math
-import functools
+import heapq
 
 def verify_fraction(x):
     if type(x) is not tuple:
@@ -57,10 +57,48 @@ def verify_fractions(fractions):
 def collect_fractions(fractions):
     # if any of the fractions in @fractions is not valid,
     # an appropriate exception will be raised
-    # returns the sum of the @fractions
+    # returns the sum of the @fractions (simplified, unless there is only one)
     
-    validate_fractions(fractions)
-    return functools.reduce(add_fractions_partial, fractions)
+    fractions = list(fractions)
+    verify_fractions(fractions)
+    if len(fractions) == 1:
+        return fractions[0]
+    if not fractions:
+        raise ValueError('cannot collect an empty sequence of fractions')
+    return sum_fractions_partial(fractions)
+
+def sum_fractions_partial(fractions):
+    # assumes the @fractions are valid fractions
+    # returns the simplified sum of the @fractions
+    # the numerators of the fractions with the same denominator are summed first. then the sums are
+    # added in pairs, and the pairwise sums in pairs and so on, so that the numbers which are
+    # multiplied are about the same size. the sum of two fractions is taken over the lcm of the
+    # denominators and simplified.
+    
+    sums = {}
+    for num, denom in fractions:
+        if denom < 0:
+            num, denom = -num, -denom
+        sums[denom] = sums.get(denom, 0) + num
+    terms = [simplify_fraction_partial((num, denom)) for denom, num in sums.items()]
+    while len(terms) > 1:
+        pairs = [add_simplified_fractions(terms[i], terms[i + 1]) for i in range(0, len(terms) - 1, 2)]
+        if len(terms) % 2:
+            pairs.append(terms[-1])
+        terms = pairs
+    return terms[0] if terms else (0, 1)
+
+def add_simplified_fractions(frac1, frac2):
+    # assumes @frac1 and @frac2 are simplified fractions
+    # returns their simplified sum, computed over the lcm of their denominators
+    n1, d1 = frac1
+    n2, d2 = frac2
+    gcd = math.gcd(d1, d2)
+    num = n1 * (d2 // gcd) + n2 * (d1 // gcd)
+    denom = d1 // gcd * d2
+    # num has no common factors with d1 // gcd and d2 // gcd, so those with denom are in gcd
+    gcd = math.gcd(num, gcd)
+    return (num // gcd, denom // gcd)
 
 def cmp_fracs(frac1, frac2):
     # assumes frac1 and frac2 are valid fractions
@@ -82,8 +120,63 @@ def sort_fractions(lof):
     # if any of the values in @lof is not a valid fraction,
     # an appropriate exception will be raised
     # returns a new list that has the same values as @lof,
-    # but is sorted in ascending order
+    # but is sorted in ascending order (equal fractions keep their order)
     
     verify_fractions(lof)
-    return sorted(lof, key=functools.cmp_to_key(cmp_fracs))
+    return sorted(lof, key=fraction_key)
+
+def nsmallest(n, fractions):
+    # returns the list of the @n smallest of the @fractions in ascending order,
+    # like sort_fractions(@fractions)[:@n]
+    return heapq.nsmallest(n, generate_verified_fractions(fractions), key=fraction_key)
+
+def nlargest(n, fractions):
+    # returns the list of the @n largest of the @fractions in descending order
+    # (equal fractions keep their order)
+    return heapq.nlargest(n, generate_verified_fractions(fractions), key=fraction_key)
+
+def merge_sorted_fractions(*streams):
+    # returns an iterator of the fractions of the iterables @streams, each of which is sorted
+    # in ascending order, in ascending order. the fractions are verified as they are reached
+    return heapq.merge(*map(generate_verified_fractions, streams), key=fraction_key)
+
+def generate_verified_fractions(fractions):
+    for fraction in fractions:
+        verify_fraction(fraction)
+        yield fraction
+
+def fraction_key(fraction):
+    # assumes @fraction is a valid fraction
+    # returns a key which orders fractions by their values: the pair of the nearest float and
+    # the simplified fraction. int / int is correctly rounded, so fractions whose floats differ
+    # are in the order of the floats; only fractions with equal floats are compared exactly.
+    
+    num, denom = simplify_fraction_partial(fraction)
+    try:
+        approximation = num / denom
+    except OverflowError:
+        approximation = math.inf if num > 0 else -math.inf
+    return (approximation, ExactFraction(num, denom))
+
+class ExactFraction:
+    # a simplified fraction, compared by cross-multiplication (its denominator is positive)
+    __slots__ = ('num', 'denom')
+
+    def __init__(self, num, denom):
+        self.num = num
+        self.denom = denom
+
+    def __eq__(self, other):
+        return self.num == other.num and self.denom == other.denom
+
+    def __lt__(self, other):
+        return self.num * other.denom < other.num * self.denom
+
+    def __gt__(self, other):
+        return self.num * other.denom > other.num * self.denom
+
+    def __le__(self, other):
+        return not self > other
 
+    def __ge__(self, other):
+        return not self < other
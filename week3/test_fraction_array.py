@@ -0,0 +1,71 @@
+import random
+import functools
+import unittest
+from array import array
+from simplify_fractions import sort_fractions, simplify_fraction, add_fractions, fraction_key
+from fraction_array import FractionArray
+
+class TestFractionArray(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(0)
+
+    def random_fractions(self, count, big=False):
+        # small fractions, with many equal ones, and with big=True some which do not fit in 64 bits
+        return [(self.rand.randrange(-6, 7) * (2 ** 70 if big and self.rand.random() < 0.3 else 1),
+                 self.rand.choice([1, 2, 3, 4, 6, -2, -3]))
+                for i in range(count)]
+
+    def test_representation(self):
+        fractions = FractionArray([(1, -2), (3, 4), (-5, -6)])
+        self.assertEqual(fractions.tolist(), [(-1, 2), (3, 4), (5, 6)])
+        self.assertIs(type(fractions.nums), array)
+        self.assertEqual(fractions[1], (3, 4))
+        self.assertEqual(fractions[1:], FractionArray([(3, 4), (5, 6)]))
+        self.assertEqual(len(FractionArray()), 0)
+        self.assertRaises(ZeroDivisionError, FractionArray, [(1, 0)])
+        self.assertRaises(TypeError, FractionArray, [(1.5, 2)])
+
+        # numbers which do not fit in 64 bits make the columns lists of ints
+        big = FractionArray([(1, 2), (2 ** 70, -3)])
+        self.assertIs(type(big.nums), list)
+        self.assertEqual(big.tolist(), [(1, 2), (-2 ** 70, 3)])
+        product = FractionArray([(2 ** 40, 3)] * 2) * FractionArray([(2 ** 40, 5)] * 2)
+        self.assertIs(type(product.nums), list)
+        self.assertEqual(product.tolist(), [(2 ** 80, 15)] * 2)
+
+    def test_arithmetic(self):
+        for big in (False, True):
+            fractions1, fractions2 = self.random_fractions(200, big), self.random_fractions(200, big)
+            array1, array2 = FractionArray(fractions1), FractionArray(fractions2)
+            self.assertEqual((array1 + array2).tolist(), list(map(add_fractions, fractions1, fractions2)))
+            self.assertEqual((array1 * array2).tolist(),
+                             [simplify_fraction((n1 * n2, d1 * d2)) for (n1, d1), (n2, d2) in zip(fractions1, fractions2)])
+            self.assertEqual((array1 + (1, -3)).tolist(), [add_fractions(fraction, (1, -3)) for fraction in fractions1])
+            self.assertEqual(((2, 3) * array1).tolist(),
+                             [simplify_fraction((2 * num, 3 * denom)) for num, denom in fractions1])
+            self.assertEqual(array1.simplify().tolist(), list(map(simplify_fraction, fractions1)))
+            self.assertEqual(array1.sum(), functools.reduce(add_fractions, fractions1))
+        with self.assertRaisesRegex(ValueError, 'same length'):
+            FractionArray([(1, 2)]) + FractionArray([(1, 2), (1, 3)])
+        self.assertRaises(ZeroDivisionError, FractionArray([(1, 2)]).__mul__, (1, 0))
+
+    def test_ordering(self):
+        # near ties: equal fractions written differently and fractions whose floats are equal
+        near_ties = [(10 ** 17 + 1, 10 ** 17), (1, 1), (-2, -2), (10 ** 17 - 1, 10 ** 17), (2 ** 70 + 1, 2 ** 70)]
+        for fractions in (near_ties, self.random_fractions(300), self.random_fractions(300, big=True)):
+            fractions_array = FractionArray(fractions)
+            ascending = sorted(range(len(fractions)), key=lambda i: fraction_key(fractions[i]))
+            descending = sorted(range(len(fractions)), key=lambda i: fraction_key(fractions[i]), reverse=True)
+            self.assertEqual(fractions_array.argsort(), ascending)
+            self.assertEqual(fractions_array.argsort(reverse=True), descending)
+            self.assertEqual([fractions_array[i] for i in ascending],
+                             FractionArray(sort_fractions(fractions)).tolist())
+            self.assertEqual(fractions_array.min(), fractions_array[ascending[0]])
+            self.assertEqual(fractions_array.max(), fractions_array[descending[0]])
+            fractions_array.sort()
+            self.assertEqual(fractions_array.tolist(), FractionArray(sort_fractions(fractions)).tolist())
+            fractions_array.sort(reverse=True)
+            self.assertEqual(fractions_array.tolist(), [FractionArray(fractions)[i] for i in descending])
+        self.assertRaises(ValueError, FractionArray().min)
+
+unittest.main()
@@ -0,0 +1,204 @@
+import os
+import random
+import tempfile
+import unittest
+import queries
+from queries import Database, Cursor, ColumnarRecords, LazyRecords, TableCache, parse_conditions_dict
+
+TYPES_LINE = 'int,str,int'
+NAMES_LINE = 'id,name,age'
+COLUMN_TYPES = [int, str, int]
+COLUMN_NAMES = ['id', 'name', 'age']
+NAMES = ['ann', 'anna', 'bob', 'bo', 'carl', 'ca,rl', '']
+
+def random_records(rand, count):
+    return [(i, rand.choice(NAMES), rand.randrange(10)) for i in range(count)]
+
+def record_to_line(record):
+    return ','.join(f'"{value}"' if type(value) is str and (',' in value or not value) else str(value)
+                    for value in record)
+
+def write_table(filename, records):
+    with open(filename, 'w') as f:
+        f.write(f'{TYPES_LINE}\n{NAMES_LINE}\n')
+        for record in records:
+            f.write(record_to_line(record) + '\n')
+
+def parse_lines_one_by_one(lines, column_types):
+    # the records of @lines, parsed like before the lines were tokenized in bulk
+    records = []
+    for line in lines:
+        tokens = queries.tokenize_line(line)
+        if len(tokens) != len(column_types):
+            raise ValueError(f'unable to parse the line "{line}". it has {len(tokens)} tokens, but '
+                             f'the number of columns is {len(column_types)}')
+        records.append(tuple(data_type(token) for data_type, token in zip(column_types, tokens)))
+    return records
+
+def outcome(proc, *args):
+    # the value of proc(*args) or the message of the ValueError it raises
+    try:
+        return ('value', proc(*args))
+    except ValueError as e:
+        return ('error', str(e))
+
+def scan(records, conditions):
+    # the records satisfying @conditions, found without indexes
+    return list(Database(COLUMN_TYPES, COLUMN_NAMES, records).generate_all_records_satisfying(conditions))
+
+CONDITION_DICTS = [{}, {'age': 3}, {'age__lt': 4}, {'age__gt': 7, 'name': 'bob'}, {'name__startswith': 'an'},
+                   {'name__startswith': 'an', 'age__lt': 5}, {'name__contains': ','}, {'name': ''},
+                   {'name': 'nobody'}, {'id__gt': 100, 'id__lt': 150, 'age': 2}]
+
+class TestQueries(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(5)
+        self.records = random_records(self.rand, 400)
+        self.dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.dir.name, 'table')
+        write_table(self.filename, self.records)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_cache_invalidation(self):
+        cache = TableCache()
+        database = cache.get(self.filename)
+        self.assertIs(cache.get(self.filename), database)
+        cache.declare_index(self.filename, 'age', 'sorted')
+
+        # a different size
+        write_table(self.filename, self.records[:-1])
+        reloaded = cache.get(self.filename)
+        self.assertIsNot(reloaded, database)
+        self.assertEqual(list(reloaded.records), self.records[:-1])
+        self.assertIn('sorted', reloaded.indexes['age'])
+
+        # the same size, but a different modification time
+        changed = [(i, name, (age + 1) % 10) for i, name, age in self.records[:-1]]
+        write_table(self.filename, changed)
+        stat = os.stat(self.filename)
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        reloaded_again = cache.get(self.filename)
+        self.assertIsNot(reloaded_again, reloaded)
+        self.assertEqual(list(reloaded_again.records), changed)
+        self.assertIn('sorted', reloaded_again.indexes['age'])
+
+    def test_eviction(self):
+        filenames = [os.path.join(self.dir.name, f'table{i}') for i in range(3)]
+        for filename in filenames:
+            write_table(filename, self.records)
+        size = queries.load_database(filenames[0], columnar=True).estimated_size()
+
+        cache = TableCache(memory_budget=2 * size, columnar=True)
+        first, second = cache.get(filenames[0]), cache.get(filenames[1])
+        cache.get(filenames[0]) # the second is now the least recently used
+        cache.get(filenames[2])
+        self.assertIs(cache.get(filenames[0]), first)
+        self.assertIsNot(cache.get(filenames[1]), second)
+
+        # the most recently used table is kept even above the budget
+        cache = TableCache(memory_budget=0, columnar=True)
+        database = cache.get(filenames[0])
+        self.assertIs(cache.get(filenames[0]), database)
+
+    def test_changed_file(self):
+        with open(self.filename, 'rb') as f:
+            column_types, column_names, data_start = queries.read_table_header(self.filename, f)
+        f = open(self.filename, 'rb')
+        records = LazyRecords(f, data_start, column_types, block_size=256)
+        self.assertEqual(records[0], self.records[0])
+        write_table(self.filename, self.records[:10])
+        with self.assertRaises(ValueError):
+            list(records)
+        f.close()
+
+        f = open(self.filename, 'rb')
+        records = LazyRecords(f, data_start, column_types, block_size=256)
+        self.assertEqual(list(records), self.records[:10])
+        self.assertTrue(f.closed)
+
+    def test_parse_columns_errors(self):
+        lines = [record_to_line(record) for record in self.records[:50]]
+        bad_lines = ['1,ann', '1,ann,2,3', 'x,ann,2', '1,"ann,2', '1,ann,', '1,"a,b",c', '1,"a"b",2', ',,']
+        for bad_line in bad_lines:
+            for i in (0, 1, 25, 49):
+                for second_bad_line in (None, '2,bob', 'y,bob,1'):
+                    test_lines = lines[:i] + [bad_line] + lines[i:]
+                    if second_bad_line is not None:
+                        test_lines.insert(min(i + 3, len(test_lines)), second_bad_line)
+                    self.assertEqual(outcome(queries.parse_records, test_lines, COLUMN_TYPES),
+                                     outcome(parse_lines_one_by_one, test_lines, COLUMN_TYPES),
+                                     test_lines)
+        self.assertEqual(queries.parse_records(lines, COLUMN_TYPES), self.records[:50])
+
+    def test_index_plans(self):
+        for columnar in (False, True):
+            records = ColumnarRecords(COLUMN_TYPES, zip(*self.records)) if columnar else list(self.records)
+            database = Database(COLUMN_TYPES, COLUMN_NAMES, records)
+            database.create_index('name', 'hash')
+            database.create_index('name', 'trie')
+            database.create_index('age', 'sorted')
+            database.create_index('id', 'sorted')
+            for conditions_dict in CONDITION_DICTS:
+                conditions = parse_conditions_dict(conditions_dict)
+                expected = scan(self.records, conditions)
+                self.assertEqual(list(database.generate_all_records_satisfying(conditions)), expected)
+                self.assertEqual(database.count_records_satisfying(conditions), len(expected))
+                self.assertEqual(list(database.generate_all_records_satisfying(conditions, order_by='age')),
+                                 sorted(expected, key=lambda record: record[2]))
+
+    def test_cursor_limits(self):
+        database = Database(COLUMN_TYPES, COLUMN_NAMES, self.records)
+        indexed = Database(COLUMN_TYPES, COLUMN_NAMES, self.records)
+        indexed.create_index('age', 'sorted')
+        for conditions_dict in CONDITION_DICTS:
+            conditions = parse_conditions_dict(conditions_dict)
+            for order_by in (None, 'age', 'name'):
+                expected = scan(self.records, conditions)
+                if order_by is not None:
+                    key = database.get_column_key(order_by)
+                    expected.sort(key=key)
+                for limit in (None, 0, 1, 3, 1000):
+                    limited = expected if limit is None else expected[:limit]
+                    for db in (database, indexed):
+                        cursor = Cursor(db, conditions, order_by, limit)
+                        self.assertEqual(cursor.all(), limited)
+                        self.assertEqual(cursor.count(), len(limited))
+                        if limited:
+                            self.assertEqual(cursor.first(), limited[0])
+                            self.assertEqual(cursor.last(), limited[-1])
+                        else:
+                            self.assertRaises(IndexError, cursor.first)
+                            self.assertRaises(IndexError, cursor.last)
+        self.assertRaises(ValueError, Cursor, database, [], None, -1)
+
+    def test_columnar_select(self):
+        records = ColumnarRecords(COLUMN_TYPES, zip(*self.records))
+        all_rows = range(len(self.records))
+        some_rows = list(range(0, len(self.records), 3))
+        for coli, predicate_name, extra_arg in [(2, 'eq', 3), (2, 'lt', 4), (2, 'gt', 8), (0, 'gt', 390),
+                                                (1, 'eq', 'bob'), (1, 'startswith', 'an'),
+                                                (1, 'contains', ','), (1, 'eq', 'nobody'), (1, 'eq', '')]:
+            predicate = queries.NAMES_TO_PREDICATES[predicate_name]
+            for rows in (None, some_rows):
+                expected = [row for row in (all_rows if rows is None else rows)
+                            if predicate(self.records[row][coli], extra_arg)]
+                self.assertEqual(records.select(coli, predicate_name, extra_arg, rows), expected)
+        # the predicates which cannot be evaluated in bulk
+        self.assertIsNone(records.select(2, 'eq', 'three'))
+        self.assertIsNone(records.select(2, 'startswith', 3))
+        self.assertIsNone(records.select(1, 'startswith', 3))
+        self.assertEqual(list(records), self.records)
+
+    def test_parallel_stable_merge(self):
+        for conditions_dict in CONDITION_DICTS:
+            for order_by in (None, 'age', 'name'):
+                queries.table_cache.clear()
+                expected = queries.filter_database(self.filename, order_by, **conditions_dict)
+                for workers in (1, 2):
+                    self.assertEqual(queries.filter_database_parallel(self.filename, workers, order_by,
+                                                                      **conditions_dict), expected)
+        self.assertRaises(ValueError, queries.filter_database_parallel, self.filename, 2, 'height')
+
+unittest.main()
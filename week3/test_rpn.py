@@ -0,0 +1,111 @@
+import random
+import unittest
+from fractions import Fraction
+from rpn import *
+from bench_rpn import evaluate_expr_by_operations_stack, random_expr_str
+
+def outcome(proc, *args):
+    # the value of proc(*args) or the message of the ValueError it raises (without the expression)
+    try:
+        return ('value', proc(*args))
+    except ValueError as e:
+        return ('error', str(e).split(' in rpn: ')[-1])
+
+def outcome_or_exception(proc, *args):
+    # the value of proc(*args) or the type of the exception it raises
+    try:
+        return ('value', proc(*args))
+    except Exception as e:
+        return ('exception', type(e))
+
+class TestRpn(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(0)
+
+    def random_tokens(self, operation_names, values, max_length):
+        # a random (usually invalid) sequence of tokens
+        return [self.rand.choice(operation_names) if self.rand.random() < 0.4 else self.rand.choice(values)
+                for i in range(self.rand.randrange(1, max_length + 1))]
+
+    def test_rpn_calc(self):
+        self.assertEqual(rpn_calc('2 3 + 4 *'), 20)
+        self.assertEqual(rpn_calc('1 3 /'), 1 / 3)
+        self.assertEqual(rpn_calc('3 1 2 min3 4 max 9 sqrt -'), 1)
+        self.assertEqual(rpn_calc('1/3 1/6 +'), Fraction(1, 2))
+        self.assertEqual(rpn_calc('7'), 7)
+
+        self.assertRaises(ValueError, rpn_calc, '')
+        self.assertRaises(ValueError, rpn_calc, '+')
+        self.assertRaises(ValueError, rpn_calc, '1 2')
+        with self.assertRaisesRegex(ValueError, 'too many items'):
+            rpn_calc('1 2 3 +')
+        with self.assertRaisesRegex(ValueError, 'not enough items'):
+            rpn_calc('1 + 2 *')
+
+    def test_same_as_operations_stack(self):
+        # the operations do not fail on these values, so the outcomes must be the same,
+        # for valid and invalid expressions
+        operation_names = ['+', '*', 'min', 'max', 'min3', 'abs', 'sqrt']
+        values = ['1', '2', '7', '0.5', '1/3']
+        for i in range(20000):
+            expr = parse(' '.join(self.random_tokens(operation_names, values, 12)))
+            self.assertEqual(outcome(evaluate_expr, expr), outcome(evaluate_expr_by_operations_stack, expr))
+
+    def test_same_as_operations_stack_with_failing_operations(self):
+        # valid expressions evaluate the same operations in a different order, so they fail or not together
+        names_by_arity = {}
+        for name, operation in operators.items():
+            names_by_arity.setdefault(operation['arity'], []).append(name)
+        for seed in range(2000):
+            tokens = random_expr_str(self.rand.randrange(1, 20), seed).split()
+            tokens = [self.rand.choice(names_by_arity[operators[token]['arity']]) if token in operators else
+                      self.rand.choice(['0', '-1', '1/2', '2j', '3'])
+                      for token in tokens]
+            expr = parse(' '.join(tokens))
+            new = outcome_or_exception(evaluate_expr, expr)
+            old = outcome_or_exception(evaluate_expr_by_operations_stack, expr)
+            if new[0] == 'value' and old[0] == 'value':
+                self.assertEqual(new, old)
+            else:
+                self.assertTrue(new[0] != 'value' and old[0] != 'value', (tokens, new, old))
+
+    def test_long_expressions(self):
+        expr = parse(random_expr_str(10 ** 5))
+        self.assertEqual(evaluate_expr(expr), evaluate_expr_by_operations_stack(expr))
+
+    def test_optimize(self):
+        dag = optimize(parse('x y + x y + * 2 3 ** - 1 0 / +'), {'x', 'y'})
+        self.assertEqual(dag.export(), [('variable', 'x'), ('variable', 'y'), ('+', (0, 1)), ('*', (2, 2)),
+                                        ('value', 8), ('-', (3, 4)), ('value', 1), ('value', 0),
+                                        ('/', (6, 7)), ('+', (5, 8))])
+        self.assertRaises(ZeroDivisionError, dag.evaluate, x=1, y=2)
+        # 0.0 and -0.0 are equal, but different values
+        self.assertEqual(len(optimize(parse('0.0 x * -0.0 x * +'), {'x'}).nodes), 6)
+        self.assertRaisesRegex(ValueError, 'not enough items', optimize, parse('1 +'))
+        for seed in range(500):
+            expr = parse(random_expr_str(self.rand.randrange(1, 30), seed))
+            dag = optimize(expr)
+            self.assertEqual(dag.evaluate(), evaluate_expr(expr))
+            self.assertEqual(evaluate_expr(dag.to_expr()), evaluate_expr(expr))
+            self.assertEqual(len(dag.nodes), 1)
+
+    def test_compile_rpn(self):
+        program = compile_rpn('x 2 ** y sqrt + 3 min')
+        self.assertEqual(program.variables, ('x', 'y'))
+        self.assertEqual(program.evaluate(x=1, y=4), 3)
+        self.assertEqual(program.evaluate(x=1, y=1), 2)
+        self.assertIs(compile_rpn('x 2 ** y sqrt + 3 min'), program)
+        self.assertRaises(ValueError, program.evaluate, x=1)
+        self.assertRaises(ValueError, program.evaluate, x=1, y=1, z=1)
+        self.assertEqual(program.evaluate_batch({'x': [1, 1, Fraction(1, 2)], 'y': [4, 1, 0]}),
+                         [3, 2, Fraction(1, 4)])
+        with self.assertRaisesRegex(ValueError, 'math domain error'):
+            program.evaluate_batch({'x': [1, 1], 'y': [1, -1]})
+        for i in range(2000):
+            tokens = self.random_tokens(['+', '*', 'min', 'max', 'min3', 'abs', 'sqrt'], ['1', '7', 'x', 'y'], 10)
+            substituted = ' '.join('2' if token == 'x' else '0.5' if token == 'y' else token for token in tokens)
+            values = {name: value for name, value in (('x', 2), ('y', 0.5)) if name in tokens}
+            self.assertEqual(outcome(lambda: compile_rpn(' '.join(tokens)).evaluate(**values)),
+                             outcome(rpn_calc, substituted))
+
+unittest.main()
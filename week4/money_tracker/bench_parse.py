@@ -0,0 +1,33 @@
+import os
+import sys
+import time
+import tempfile
+import parse
+import generate_ledger
+
+# compares the serial parser with read_database_from_file_parallel
+# usage: bench_parse.py [number of records]
+
+WORKER_COUNTS = (1, 2, 4, 8)
+
+def time_it(proc):
+    start = time.perf_counter()
+    result = proc()
+    return time.perf_counter() - start, result
+
+def main():
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'ledger')
+        generate_ledger.write_ledger(filename, records, days=10 * 365)
+        serial_time, serial_db = time_it(lambda: parse.read_database_from_file(filename))
+        print(f'{records} records')
+        print(f'serial parse_lines: {serial_time:.2f}s')
+        for workers in WORKER_COUNTS:
+            parallel_time, parallel_db = time_it(
+                lambda: parse.read_database_from_file_parallel(filename, workers))
+            assert parallel_db.tuples == serial_db.tuples
+            print(f'{workers} workers: {parallel_time:.2f}s ({serial_time / parallel_time:.2f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import datetime
+import tempfile
+import importlib.util
+import constants
+import parse
+import snapshot
+import generate_ledger
+
+# times parsing, the queries of the repl and serialization of the money tracker implementations
+# on a generated ledger, and prints the results as json.
+# an engine is a function of (filename, dates, repeat) which returns a dict mapping the name of
+# each measured operation to its best time in seconds. @dates are dd-mm-yyyy strings of dates in
+# the ledger, used for the per date queries. engines name the same operation the same way, so that
+# the results can be compared across them. to compare a new implementation, add it to ENGINES.
+
+WEEK2_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'week2', 'money_tracker.py')
+
+def load_week2():
+    spec = importlib.util.spec_from_file_location('week2_money_tracker', WEEK2_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def best_time(proc, repeat):
+    # returns the minimum time of @repeat calls of @proc
+    result = float('inf')
+    for i in range(repeat):
+        start = time.perf_counter()
+        proc()
+        result = min(result, time.perf_counter() - start)
+    return result
+
+def week2_engine(filename, dates, repeat):
+    week2 = load_week2()
+    user_data = week2.read_user_data_from_file(filename)
+    return {'parse': best_time(lambda: week2.read_user_data_from_file(filename), repeat),
+            'show_data_per_date': best_time(
+                lambda: [week2.show_user_data_per_date(date, user_data) for date in dates], repeat),
+            'show_expenses_ordered_by_categories': best_time(
+                lambda: week2.list_user_expenses_ordered_by_categories(user_data), repeat),
+            'serialize': best_time(lambda: week2.user_data_to_str(user_data), repeat)}
+
+def week4_engine(filename, dates, repeat, read_database=parse.read_database_from_file):
+    db = read_database(filename)
+    dates = [parse.parse_date(date) for date in dates]
+
+    def query_per_date():
+        for date in dates:
+            condition = db.make_query_condition(column_names={'date'}, equal_to=date)
+            db.query(condition, restrict_to={'amount', 'category', 'type'})
+
+    def query_expenses_by_category():
+        condition = db.make_query_condition(column_names={'type'}, equal_to=constants.EXPENSE_STR)
+        db.query(condition, restrict_to={'amount', 'category'}, sort_by={'category'})
+
+    return {'parse': best_time(lambda: read_database(filename), repeat),
+            'show_data_per_date': best_time(query_per_date, repeat),
+            'show_expenses_ordered_by_categories': best_time(query_expenses_by_category, repeat),
+            'query_sorted_by_amount': best_time(lambda: db.query(sort_by={'amount'}), repeat),
+            'serialize': best_time(lambda: parse.db_to_str(db), repeat)}
+
+def week4_snapshot_engine(filename, dates, repeat):
+    snapshot.read_database(filename) # make sure the snapshot is up to date
+    return week4_engine(filename, dates, repeat, read_database=snapshot.read_database)
+
+ENGINES = {'week2': week2_engine,
+           'week4': week4_engine,
+           'week4-snapshot': week4_snapshot_engine}
+
+def sample_dates(filename, n, seed):
+    # returns @n random dates (as they are written) of the date lines of the ledger @filename
+    with open(filename) as f:
+        dates = [line.strip('= \n') for line in f if line.startswith('===')]
+    rand = random.Random(seed)
+    return [rand.choice(dates) for i in range(n)] if dates else []
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmarks the money tracker implementations')
+    generate_ledger.add_arguments(parser)
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES), default=sorted(ENGINES))
+    parser.add_argument('--repeat', type=int, default=3, help='the best of this many runs is reported')
+    parser.add_argument('--date-queries', type=int, default=100, help='number of per date queries')
+    args = parser.parse_args()
+
+    params = {'records': args.records, 'days': args.days, 'categories': args.categories, 'seed': args.seed}
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'ledger')
+        generate_ledger.write_ledger(filename, args.records, days=args.days,
+                                     categories=args.categories, seed=args.seed)
+        dates = sample_dates(filename, args.date_queries, args.seed)
+        results = {name: ENGINES[name](filename, dates, args.repeat) for name in args.engines}
+
+    report = {'time': datetime.datetime.now().isoformat(timespec='seconds'),
+              'python': platform.python_version(),
+              'params': dict(params, repeat=args.repeat, date_queries=args.date_queries),
+              'results': results}
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+if __name__ == '__main__':
+    main()
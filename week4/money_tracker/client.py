@@ -0,0 +1,47 @@
+import sys
+import json
+import socket
+
+# sends requests to a ledger server (see server.py) and prints its answers, one json object per line
+# usage:
+#   client.py <socket> <command> [name=value ...]
+#       sends a single request, for example: client.py ledger.sock date date=1-1-2020
+#   client.py <socket>
+#       reads requests (json objects, one per line) from stdin and sends them all over one connection
+
+def send_requests(socket_path, requests):
+    # sends the dicts @requests to the server at @socket_path and yields its answers (dicts) in order
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile('rwb') as stream:
+            for request in requests:
+                stream.write(json.dumps(request).encode('utf-8') + b'\n')
+                stream.flush()
+                line = stream.readline()
+                if not line:
+                    raise ConnectionError('the server closed the connection')
+                yield json.loads(line)
+
+def request_from_args(command, args):
+    # returns the request for the command @command with the name=value arguments @args
+    request = {'command': command}
+    for arg in args:
+        name, sep, value = arg.partition('=')
+        if not sep:
+            raise ValueError(f'expected an argument of the form name=value, but was given "{arg}"')
+        request[name] = value
+    return request
+
+def main():
+    if len(sys.argv) < 2:
+        raise ValueError('expected the path of the socket of the server')
+    socket_path = sys.argv[1]
+    if len(sys.argv) > 2:
+        requests = [request_from_args(sys.argv[2], sys.argv[3:])]
+    else:
+        requests = (json.loads(line) for line in sys.stdin if line.strip())
+    for answer in send_requests(socket_path, requests):
+        print(json.dumps(answer))
+
+if __name__ == '__main__':
+    main()
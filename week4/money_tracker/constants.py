@@ -2,3 +2,19 @@ EXPENSE_STR = 'New Expense'
 INCOME_STR = 'New Income'
 COLUMN_NAMES = ('date', 'amount', 'category', 'type')
 PROMPT = '>>> '
+# columns with few distinct values, stored dictionary-encoded
+ENCODED_COLUMNS = ('category', 'type')
+# columns with hash and sorted indexes
+INDEXED_COLUMNS = ('date', 'category', 'type')
+# how many records the parser collects before adding them to the database
+PARSE_BATCH_SIZE = 10000
+# the write-ahead log of the ledger "name" is the file "name" + WAL_SUFFIX
+WAL_SUFFIX = '.wal'
+# when the write-ahead log grows above this many bytes, it is merged into the ledger at startup
+WAL_COMPACT_THRESHOLD = 1 << 20
+# the binary snapshot of the ledger "name" is the file "name" + SNAPSHOT_SUFFIX
+SNAPSHOT_SUFFIX = '.snap'
+# amounts are stored in snapshots as integer multiples of 1 / SNAPSHOT_AMOUNT_SCALE
+SNAPSHOT_AMOUNT_SCALE = 10 ** 6
+# when parsing a ledger in parallel, it is split into this many chunks per worker process
+CHUNKS_PER_WORKER = 4
@@ -0,0 +1,55 @@
+import sys
+import random
+import argparse
+import datetime
+import constants
+
+# generates synthetic ledgers in the text format read by both week2/money_tracker.py
+# and week4/money_tracker (dates are written as dd-mm-yyyy, which both accept)
+
+def generate_lines(records, days=365, categories=20, start=datetime.date(2000, 1, 1), seed=0):
+    # yields the lines (without newlines) of a ledger with @records data lines, whose dates are
+    # spread over @days days beginning at @start, with @categories distinct categories.
+    # the dates are in ascending order. the same @seed always gives the same ledger.
+    rand = random.Random(seed)
+    category_names = [f'category{i}' for i in range(categories)]
+    per_day = [0] * days
+    for i in range(records):
+        per_day[rand.randrange(days)] += 1
+    for day, count in enumerate(per_day):
+        if not count:
+            continue
+        date = start + datetime.timedelta(days=day)
+        yield f'=== {date.day:02}-{date.month:02}-{date.year:04} ==='
+        for i in range(count):
+            if rand.random() < 0.5:
+                amount = rand.randint(1, 1000)
+            else:
+                amount = rand.randint(1, 100000) / 100
+            _type = constants.INCOME_STR if rand.random() < 0.3 else constants.EXPENSE_STR
+            yield f'{amount}, {rand.choice(category_names)}, {_type}'
+
+def write_ledger(filename, records, **kwargs):
+    # writes the ledger generate_lines(@records, **@kwargs) to the file @filename
+    with open(filename, 'w') as f:
+        for line in generate_lines(records, **kwargs):
+            f.write(line)
+            f.write('\n')
+
+def add_arguments(parser):
+    # adds the parameters of generate_lines to the argparse.ArgumentParser @parser
+    parser.add_argument('--records', type=int, default=100000, help='number of data lines')
+    parser.add_argument('--days', type=int, default=365, help='number of days the dates are spread over')
+    parser.add_argument('--categories', type=int, default=20, help='number of distinct categories')
+    parser.add_argument('--seed', type=int, default=0)
+
+def main():
+    parser = argparse.ArgumentParser(description='writes a synthetic ledger to stdout')
+    add_arguments(parser)
+    args = parser.parse_args()
+    for line in generate_lines(args.records, days=args.days, categories=args.categories, seed=args.seed):
+        sys.stdout.write(line)
+        sys.stdout.write('\n')
+
+if __name__ == '__main__':
+    main()
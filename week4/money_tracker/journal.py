@@ -0,0 +1,111 @@
+import os
+import heapq
+import operator
+import constants
+import parse
+
+class Journal:
+    # keeps the changes to the ledger @filename in a write-ahead log (@filename + constants.WAL_SUFFIX),
+    # so that saving a session does not rewrite the whole ledger.
+    # the log is itself a ledger: every added tuple is appended as a date line followed by a data line,
+    # so the log can be read with parse.generate_records.
+    # compact() merges the log into the ledger and empties the log.
+    # @read_database is used to read the ledger itself
+
+    def __init__(self, filename, read_database=parse.read_database_from_file):
+        self.filename = filename
+        self.read_database = read_database
+        self.wal_filename = filename + constants.WAL_SUFFIX
+        self._wal = None
+
+    def open_database(self):
+        # returns the database of the ledger with the log replayed on top of it
+        # from now on, every tuple added to the database is appended to the log
+        if os.path.exists(self.filename):
+            db = self.read_database(self.filename)
+        else:
+            db = parse.new_database()
+        db.add_tuples(self._read_wal())
+        self._drop_torn_line()
+        self._wal = open(self.wal_filename, 'a')
+        db.add_listener(self._append)
+        return db
+
+    def close(self):
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+
+    def wal_size(self):
+        # returns the size of the log in bytes
+        try:
+            return os.path.getsize(self.wal_filename)
+        except FileNotFoundError:
+            return 0
+
+    def _append(self, tup):
+        # writes @tup to the log and makes sure it reached the disk
+        date, amount, category, _type = tup
+        self._wal.write(f'{parse.date_to_output_str(date)}\n{amount}, {category}, {_type}\n')
+        self._wal.flush()
+        os.fsync(self._wal.fileno())
+
+    def _drop_torn_line(self):
+        # truncates the log after its last newline, so that the next tuple is not appended
+        # to a line which was cut short by a crash
+        try:
+            with open(self.wal_filename, 'rb+') as f:
+                data = f.read()
+                end = data.rfind(b'\n') + 1
+                if end < len(data):
+                    f.truncate(end)
+        except FileNotFoundError:
+            pass
+
+    def _read_wal(self):
+        # returns the list of tuples in the log
+        # a last line without a newline was cut short by a crash, so it is dropped
+        try:
+            with open(self.wal_filename) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+        if lines and not lines[-1].endswith('\n'):
+            lines.pop()
+        if not lines:
+            return []
+        try:
+            return list(parse.generate_records(lines))
+        except ValueError as e:
+            raise ValueError(f'corrupt write-ahead log "{self.wal_filename}": {e}')
+
+    def compact(self):
+        # merges the log into the ledger, which stays sorted by date, and empties the log
+        # the ledger is streamed, so only the log is held in memory.
+        # if this is interrupted after the ledger is replaced, the next replay of the log
+        # adds tuples which are already in the database, which has no effect.
+        wal_records = sorted(self._read_wal(), key=operator.itemgetter(0))
+        if not wal_records:
+            return
+        tmp_filename = self.filename + '.tmp'
+        with open(tmp_filename, 'w') as out:
+            if os.path.exists(self.filename):
+                with open(self.filename) as f:
+                    merged = heapq.merge(parse.generate_records(f), wal_records, key=operator.itemgetter(0))
+                    _write_lines(out, parse.records_to_lines(merged))
+            else:
+                _write_lines(out, parse.records_to_lines(wal_records))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_filename, self.filename)
+
+        reopen = self._wal is not None
+        self.close()
+        open(self.wal_filename, 'w').close()
+        if reopen:
+            self._wal = open(self.wal_filename, 'a')
+
+def _write_lines(f, lines):
+    for line in lines:
+        f.write(line)
+        f.write('\n')
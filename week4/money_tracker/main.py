@@ -1,6 +1,11 @@
+import os
 import sys
+import functools
 import parse
 import constants
+import summary
+import snapshot
+from journal import Journal
 
 def repl(user_data):
     def quit_on_eof(handler):
@@ -26,7 +31,7 @@ def repl(user_data):
 
         print('enter date:')
         date = parse.read_date_from_stdin()
-        is_from_date = user_data.make_query_condition(lambda current_date: current_date == date, column_names={'date'})
+        is_from_date = user_data.make_query_condition(column_names={'date'}, equal_to=date)
         print('\n'.join(f'{amount}, {category}, {_type}' for amount, category, _type in
                         user_data.query(is_from_date, restrict_to={'amount', 'category', 'type'})))
 
@@ -35,7 +40,7 @@ def repl(user_data):
         # the tuple must be an expense
         # sort the result based on the category
 
-        is_expense = user_data.make_query_condition(lambda _type: _type == constants.EXPENSE_STR, column_names={'type'})
+        is_expense = user_data.make_query_condition(column_names={'type'}, equal_to=constants.EXPENSE_STR)
         print('\n'.join(f'{amount}, {category}' for amount, category in
                         user_data.query(is_expense, restrict_to={'amount', 'category'}, sort_by={'category'})))
               
@@ -59,6 +64,9 @@ def repl(user_data):
         category = parse.read_category_from_stdin()
         user_data.add_tuple(date, amount, category, constants.EXPENSE_STR)
 
+    def show_summary():
+        print(summary.summary_to_str(user_data))
+
     def exit_repl():
         nonlocal keep_going
         keep_going = False
@@ -68,7 +76,11 @@ def repl(user_data):
            3: {'msg': 'show expenses, ordered by categories', 'handler': show_expenses_ordered_by_categories},
            4: {'msg': 'add new income', 'handler': add_new_income},
            5: {'msg': 'add new expense', 'handler': add_new_expense},
-           6: {'msg': 'exit', 'handler': exit_repl}}
+           6: {'msg': 'show summary', 'handler': show_summary},
+           7: {'msg': 'exit', 'handler': exit_repl}}
+
+    # the views are kept up to date by add_tuple, so show_summary does not scan the tuples
+    summary.create_views(user_data)
 
     option_lines = [f"{op} - {ops[op]['msg']}" for op in ops]
     option_text = 'Choose one of the following options to continue:\n{}'.format('\n'.join(option_lines))
@@ -93,13 +105,56 @@ def repl(user_data):
         op_func()
         print()
 
+# the options of main.py; see main
+FLAGS = {'--journal', '--compact', '--snapshot', '--parallel'}
+
+def parse_arguments(argv, valid_flags, number_of_args):
+    # splits the command line arguments @argv into a set of flags (arguments beginning with --)
+    # and a list of the other arguments. raises ValueError if there is a flag not in @valid_flags,
+    # or the number of the other arguments is not @number_of_args
+    flags = {arg for arg in argv if arg.startswith('--')}
+    args = [arg for arg in argv if not arg.startswith('--')]
+    invalid_flags = flags - valid_flags
+    if invalid_flags:
+        raise ValueError(f'invalid options: {", ".join(sorted(invalid_flags))}')
+    if len(args) != number_of_args:
+        raise ValueError(f'expected {number_of_args} argument(s), but found {len(args)}')
+    return flags, args
+
+def open_ledger(filename, flags):
+    # reads the ledger @filename as the options @flags say (see main)
+    # returns a (user_data, close) pair; calling close() saves the changes to user_data
+    read_database = snapshot.read_database if '--snapshot' in flags else parse.read_database_from_file
+    if '--parallel' in flags:
+        read_database = functools.partial(read_database, workers=os.cpu_count())
+
+    if '--journal' in flags:
+        journal = Journal(filename, read_database)
+        if journal.wal_size() > constants.WAL_COMPACT_THRESHOLD:
+            journal.compact()
+        return journal.open_database(), journal.close
+
+    user_data = read_database(filename)
+    def close():
+        parse.write_database_to_file(user_data, filename)
+        if '--snapshot' in flags:
+            snapshot.write_snapshot(user_data, filename)
+    return user_data, close
+
 def main():
-    if len(sys.argv) != 2:
-        raise ValueError(f'expected 1 argument, but found {len(sys.argv) - 1}')
-    filename = sys.argv[1]
-    user_data = parse.read_database_from_file(filename)
+    # usage: main.py [--journal] [--compact] [--snapshot] [--parallel] <ledger>
+    # --journal: changes are appended to a write-ahead log instead of rewriting the ledger on exit
+    # --compact: merges the write-ahead log into the ledger (and exits, unless --journal is given)
+    # --snapshot: the ledger is loaded from its binary snapshot, when that is up to date
+    # --parallel: the ledger is parsed by one process per cpu
+    flags, (filename,) = parse_arguments(sys.argv[1:], FLAGS, 1)
+    if '--compact' in flags:
+        Journal(filename).compact()
+        if '--journal' not in flags:
+            return
+    user_data, close = open_ledger(filename, flags)
     repl(user_data)
-    parse.write_database_to_file(user_data, filename)
+    close()
     
 if __name__ == '__main__':
     main()
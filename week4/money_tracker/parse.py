@@ -1,21 +1,121 @@
+import io
+import os
 import re
 import constants
 import datetime
 import itertools
+from concurrent.futures import ProcessPoolExecutor
 from simple_database import Database
 
-def read_database_from_file(filename):
+def read_database_from_file(filename, workers=1):
     # if it is not possible to parse the contents of
     # the file named @filename to a database, a ValueError is raised
+    # the file is read line by line, so it is never held in memory as a whole
+    # if @workers > 1, the file is parsed by that many processes (see read_database_from_file_parallel)
+    if workers > 1:
+        return read_database_from_file_parallel(filename, workers)
     with open(filename) as f:
-        lines = f.readlines()
-    return parse_lines(lines)
+        return parse_lines(f)
+
+def read_database_from_file_parallel(filename, workers):
+    # returns the same database as read_database_from_file(@filename), raising the same errors,
+    # but the file is parsed by a pool of @workers processes.
+    # the file is split at date lines into chunks (see split_file), which are parsed independently.
+    # each chunk is read once, and its line count comes back with its records, so that the line
+    # number of an error is found in the parent from the line counts of the chunks before it.
+
+    boundaries = split_file(filename, workers * constants.CHUNKS_PER_WORKER)
+    starts, ends = boundaries[:-1], boundaries[1:]
+    columns = [[] for name in constants.COLUMN_NAMES]
+    first_line_num = 1
+    with ProcessPoolExecutor(workers) as executor:
+        chunks = executor.map(_parse_chunk, itertools.repeat(filename), starts, ends)
+        for start, end, (line_count, chunk_columns) in zip(starts, ends, chunks):
+            if chunk_columns is None:
+                # parsing the chunk again with its line numbers in the file raises the error
+                # of the serial parser
+                list(generate_records(_read_chunk(filename, start, end), first_line_num))
+            for column, chunk_column in zip(columns, chunk_columns):
+                column.extend(chunk_column)
+            first_line_num += line_count
+    # equal tuples are dropped by from_columns, like Database.add_tuple does
+    return new_database_from_columns(columns)
+
+def split_file(filename, n):
+    # returns the byte offsets [0, b1, ..., size] which split the ledger @filename into
+    # at most @n chunks of about the same size. every chunk except the first begins with a date line.
+    size = os.path.getsize(filename)
+    boundaries = [0]
+    with open(filename, 'rb') as f:
+        for i in range(1, n):
+            offset = size * i // n
+            if offset <= boundaries[-1]:
+                continue
+            f.seek(offset)
+            f.readline() # go to the beginning of the next line
+            while True:
+                line_start = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if line.lstrip().startswith(b'==='):
+                    if line_start > boundaries[-1]:
+                        boundaries.append(line_start)
+                    break
+    if boundaries[-1] != size or len(boundaries) == 1:
+        boundaries.append(size)
+    return boundaries
+
+def _read_chunk(filename, start, end):
+    # returns the lines of the file @filename between the byte offsets @start and @end,
+    # decoded and with newlines translated exactly like iterating over open(@filename) does
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return io.TextIOWrapper(io.BytesIO(data))
+
+def _parse_chunk(filename, start, end):
+    # returns (the number of lines, the columns of the records) of the chunk of the file @filename
+    # between the byte offsets @start and @end, or (the number of lines, None) if it cannot be parsed
+    lines = _read_chunk(filename, start, end).readlines()
+    try:
+        records = list(generate_records(lines))
+    except ValueError:
+        return len(lines), None
+    return len(lines), [list(column) for column in zip(*records)] or [[] for name in constants.COLUMN_NAMES]
 
 def parse_lines(lines):
-    # returns the user_data corresponding to @lines
+    # returns the user_data corresponding to @lines, which can be any iterable of lines
     # if the first line is not a date line, a ValueError is raised
     # if parsing a line from @lines is not a date line or a data line, a ValueError is raised
-    
+    # the records are added to the database in batches of constants.PARSE_BATCH_SIZE,
+    # so @lines can be streamed (for example an open file)
+
+    db = new_database()
+    records = generate_records(lines)
+    while True:
+        batch = list(itertools.islice(records, constants.PARSE_BATCH_SIZE))
+        if not batch:
+            return db
+        db.add_tuples(batch)
+
+def new_database():
+    # returns an empty database with the columns of a ledger
+    return Database(constants.COLUMN_NAMES, (),
+                    encoded_columns=constants.ENCODED_COLUMNS, indexed_columns=constants.INDEXED_COLUMNS)
+
+def new_database_from_columns(columns):
+    # returns the database with the columns of a ledger, whose tuples are given column by column
+    # (see Database.from_columns)
+    return Database.from_columns(constants.COLUMN_NAMES, columns,
+                                 encoded_columns=constants.ENCODED_COLUMNS,
+                                 indexed_columns=constants.INDEXED_COLUMNS)
+
+def generate_records(lines, first_line_num=1):
+    # yields the (date, amount, category, type) tuples described by @lines, in order
+    # raises a ValueError (indicating the line number) when a line cannot be parsed
+    # @first_line_num is the number of the first line of @lines in its file; the first line must be a date line
+
     date_line_pattern = re.compile(r'\s*===\s*(.+)\s*===')
     data_line_pattern = re.compile(r'\s*(.+)\s*,\s*(.+)\s*,\s*({inc_str}|{exp_str})'
                                    .format(inc_str=constants.INCOME_STR, exp_str=constants.EXPENSE_STR))
@@ -41,18 +141,20 @@ def parse_lines(lines):
             return ('data', amount, category, _type)
 
         raise ValueError('the line is neither a data line nor a date line')
-    
+
+    lines_iter = iter(lines)
     try:
-        first_parsed = parse_line(lines[0])
+        first_parsed = parse_line(next(lines_iter, ''))
     except ValueError:
-        raise ValueError(f'unable to parse the first line')
+        if first_line_num == 1:
+            raise ValueError(f'unable to parse the first line')
+        raise ValueError(f'unable to parse line {first_line_num}')
 
     if first_parsed[0] != 'date':
         raise ValueError(f'the first line must be a date')
         
     current_date = first_parsed[1]
-    tuples = []
-    for line_num, line in enumerate(itertools.islice(lines, 1, len(lines)), start=2):
+    for line_num, line in enumerate(lines_iter, start=first_line_num + 1):
         try:
             parsed = parse_line(line)
         except ValueError:
@@ -61,8 +163,7 @@ def parse_lines(lines):
             current_date = parsed[1]
         else:
             amount, category, _type = parsed[1:]
-            tuples.append((current_date, amount, category, _type))
-    return Database(constants.COLUMN_NAMES, tuples)
+            yield (current_date, amount, category, _type)
 
 def parse_amount(amount_str):
     # tries to convert @amount_str to a number
@@ -89,7 +190,10 @@ def parse_date(date_str):
     if not m:
         raise ValueError(f'invalid date format: "{date_str}"')
     day, month, year = map(int, m.group(1, 2, 3))
-    return datetime.date(year, month, day)
+    try:
+        return datetime.date(year, month, day)
+    except OverflowError:
+        raise ValueError(f'invalid date: "{date_str}"')
 
 def date_to_str(date):
     # parse_date(date_to_str(date)) == date must be true
@@ -144,15 +248,15 @@ def read_amount_from_stdin():
 
 
 def db_to_str(db):
-    records = db.query(sort_by={'date'})
-    if not records:
-        return ''
-    current_date = records[0][0]
-    lines = [date_to_output_str(current_date)]
-    for record in records:
-        date, amount, category, _type = record
+    return '\n'.join(records_to_lines(db.query(sort_by={'date'})))
+
+def records_to_lines(records):
+    # yields the lines (without newlines) of the text format of @records,
+    # an iterable of (date, amount, category, type) tuples
+    # a date line is emitted whenever the date changes, so @records should be sorted by date
+    current_date = None
+    for date, amount, category, _type in records:
         if date != current_date:
             current_date = date
-            lines.append(date_to_output_str(date))
-        lines.append(f'{amount}, {category}, {_type}')
-    return '\n'.join(lines)
+            yield date_to_output_str(date)
+        yield f'{amount}, {category}, {_type}'
@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import signal
+import socketserver
+import constants
+import parse
+import summary
+import main
+
+# serves a ledger over a unix socket, so that it is parsed once and then queried many times.
+# usage: server.py [--journal] [--snapshot] [--parallel] <ledger> <socket>
+# the options are those of main.py. the ledger is saved when the server stops (ctrl-c or the
+# "shutdown" command); with --journal every addition is saved as soon as it is made.
+#
+# protocol: the client sends requests, one json object per line, and for each request the server
+# answers with one json object on a line. a connection can carry any number of requests.
+# a request has a "command" and the arguments of that command:
+#   {"command": "add", "type": "income" | "expense", "date": "d-m-yyyy", "amount": ..., "category": ...}
+#   {"command": "date", "date": "d-m-yyyy"}: the [amount, category, type] entries on the date
+#   {"command": "expenses"}: the [amount, category] of all expenses, ordered by category
+#   {"command": "all"}: the ledger in its text format
+#   {"command": "summary"}: the aggregates by category, the monthly balances and the daily totals
+#   {"command": "save"}: saves the ledger (not needed with --journal)
+#   {"command": "shutdown"}: saves the ledger and stops the server
+# the answer is {"ok": true, "result": ...} or {"ok": false, "error": <message>}
+
+SERVER_FLAGS = {'--journal', '--snapshot', '--parallel'}
+
+TYPES = {'income': constants.INCOME_STR, 'expense': constants.EXPENSE_STR}
+
+class LedgerServer(socketserver.UnixStreamServer):
+    # requests are handled one at a time, so the database needs no locking
+
+    def __init__(self, socket_path, user_data, save):
+        # @save is None when every change is saved as it is made
+        super().__init__(socket_path, LedgerRequestHandler)
+        self.user_data = user_data
+        self.save = save
+        summary.create_views(user_data)
+        self.commands = {'add': self.add,
+                         'date': self.entries_at_date,
+                         'expenses': self.expenses_by_category,
+                         'all': self.all_data,
+                         'summary': self.summary_data,
+                         'save': self.save_ledger,
+                         'shutdown': self.shutdown_server}
+        self.stopping = False
+
+    def execute(self, request):
+        # returns the answer to the decoded json object @request
+        try:
+            if type(request) is not dict:
+                raise ValueError('a request must be a json object')
+            command_name = request.get('command')
+            command = self.commands.get(command_name) if type(command_name) is str else None
+            if command is None:
+                raise ValueError(f'invalid command: {request.get("command")!r}. '
+                                 f'expected one of {", ".join(sorted(self.commands))}')
+            return {'ok': True, 'result': command(request)}
+        except KeyError as e:
+            return {'ok': False, 'error': f'missing argument: {e}'}
+        except ValueError as e:
+            return {'ok': False, 'error': str(e)}
+
+    def add(self, request):
+        _type = TYPES.get(request['type']) if type(request['type']) is str else None
+        if _type is None:
+            raise ValueError(f'invalid type: {request["type"]!r}')
+        date = parse.parse_date(str(request['date']))
+        amount = parse.parse_amount(str(request['amount']))
+        category = parse.parse_category(str(request['category']))
+        self.user_data.add_tuple(date, amount, category, _type)
+
+    def entries_at_date(self, request):
+        date = parse.parse_date(str(request['date']))
+        condition = self.user_data.make_query_condition(column_names={'date'}, equal_to=date)
+        return self.user_data.query(condition, restrict_to={'amount', 'category', 'type'})
+
+    def expenses_by_category(self, request):
+        condition = self.user_data.make_query_condition(column_names={'type'}, equal_to=constants.EXPENSE_STR)
+        return self.user_data.query(condition, restrict_to={'amount', 'category'}, sort_by={'category'})
+
+    def all_data(self, request):
+        return parse.db_to_str(self.user_data)
+
+    def summary_data(self, request):
+        by_category = self.user_data.view(summary.BY_CATEGORY_VIEW)
+        return {'by_category': [[category, _type, *aggregate]
+                                for (category, _type), aggregate in sorted(by_category.items())],
+                'monthly': summary.monthly_balances(self.user_data),
+                'daily': [[parse.date_to_str(date), count, net]
+                          for date, count, net in summary.daily_totals(self.user_data)]}
+
+    def save_ledger(self, request):
+        if self.save is not None:
+            self.save()
+
+    def shutdown_server(self, request):
+        self.stopping = True
+
+class LedgerRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                answer = {'ok': False, 'error': f'invalid json: {e}'}
+            else:
+                answer = self.server.execute(request)
+            self.wfile.write(json.dumps(answer).encode('utf-8') + b'\n')
+            if self.server.stopping:
+                return
+
+def serve(filename, socket_path, flags):
+    # serves the ledger @filename on the unix socket @socket_path until a shutdown command or ctrl-c
+    user_data, close = main.open_ledger(filename, flags)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    # stop (and save) on SIGTERM like on ctrl-c
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with LedgerServer(socket_path, user_data, None if '--journal' in flags else close) as server:
+        try:
+            while not server.stopping:
+                server.handle_request()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+            close()
+
+if __name__ == '__main__':
+    flags, (filename, socket_path) = main.parse_arguments(sys.argv[1:], SERVER_FLAGS, 2)
+    serve(filename, socket_path, flags)
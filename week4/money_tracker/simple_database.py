@@ -1,59 +1,601 @@
+import heapq
+import bisect
+import itertools
+from array import array
+from collections import namedtuple
+
+# the aggregates of one group of a view
+Aggregate = namedtuple('Aggregate', ['count', 'total', 'minimum', 'maximum'])
+
+# the maximum number of query plans a database keeps
+_PLAN_CACHE_SIZE = 128
+
+# the initial number of slots of the table of rows of a database (a power of 2)
+_MIN_SLOTS = 8
+
+# marks an argument which was not given (None can be a legitimate value)
+_NOTHING = object()
+
 class Database:
-    def __init__(self, column_names, tuples):
+    # representation:
+    # the tuples are stored column by column: self._columns[i] holds the values of
+    # the column named self.column_names[i], so the tuple with row number r is
+    # (self._columns[0][r], self._columns[1][r], ...).
+    # a column named in @encoded_columns is dictionary-encoded: self._columns[i] is an
+    # array of codes, self._code_to_value[i] is a list mapping each code to its value
+    # and self._value_to_code[i] is the inverse dict. use this for columns with few distinct values.
+    # every column named in @indexed_columns has
+    #   - a hash index (self._hash_indexes[i]), mapping each value to the list of rows having it
+    #   - a sorted index (self._sorted_keys[i], self._sorted_rows[i]), which are the values of
+    #     the column in ascending order together with their rows. when a tuple is added out of
+    #     order, the sorted index is dropped (set to None) and rebuilt the next time it is needed.
+    # add_tuple finds duplicates with a hash table of the rows, so the tuples are not kept a second
+    # time: self._slots[i] is a row (-1 for an empty slot) and self._slot_hashes[i] the hash of its
+    # tuple. the row of a tuple with hash h is in the first slot at or after h & (len(self._slots) - 1)
+    # (wrapping around) which is not occupied by another row. the table is at most two thirds full.
+
+    # rep invariant: there are no two equal tuples (the database behaves like a set of tuples)
+
+    def __init__(self, column_names, tuples, encoded_columns=(), indexed_columns=()):
         self.column_names = tuple(column_names)
         self.column_names_set = set(self.column_names)
-        self.tuples = set(tuples)
-    
-    def query(self, condition=None, restrict_to=None, sort_by=None):
+        self._verify_column_names(encoded_columns, msg='encoded_columns contains an invalid column name')
+        self._verify_column_names(indexed_columns, msg='indexed_columns contains an invalid column name')
+
+        self._columns = []
+        self._code_to_value = {}
+        self._value_to_code = {}
+        for i, name in enumerate(self.column_names):
+            if name in encoded_columns:
+                self._columns.append(array('l'))
+                self._code_to_value[i] = []
+                self._value_to_code[i] = {}
+            else:
+                self._columns.append([])
+
+        indexed = self._get_indicies(indexed_columns)
+        self._hash_indexes = {i: {} for i in indexed}
+        self._sorted_keys = {i: [] for i in indexed}
+        self._sorted_rows = {i: [] for i in indexed}
+        self._slots = array('q', [-1]) * _MIN_SLOTS
+        self._slot_hashes = array('q', [0]) * _MIN_SLOTS
+        self._size = 0
+        self._listeners = []
+        self._views = {}
+        self._plans = {}
+        self.add_tuples(tuples)
+
+    @classmethod
+    def from_columns(cls, column_names, columns, encoded_columns=(), indexed_columns=()):
+        # returns the database whose tuples are given column by column: @columns[i] holds
+        # the values of the column @column_names[i], and all columns have the same length.
+        # a column named in @encoded_columns can also be given already encoded, as a (codes, values)
+        # pair, where values is a list of distinct values and codes is a sequence of indexes in it.
+        # a repeated tuple is dropped, like add_tuple does, and the first one is kept
+
+        db = cls(column_names, (), encoded_columns, indexed_columns)
+        if len(columns) != len(db.column_names):
+            raise ValueError(f'expected {len(db.column_names)} columns, but was given {len(columns)}')
+        for coli, column in enumerate(columns):
+            if coli in db._code_to_value:
+                if type(column) is tuple:
+                    codes, values = column
+                else:
+                    value_to_code = {}
+                    codes = [value_to_code.setdefault(value, len(value_to_code)) for value in column]
+                    values = list(value_to_code)
+                db._columns[coli] = array('l', codes)
+                db._code_to_value[coli] = list(values)
+                db._value_to_code[coli] = {value: code for code, value in enumerate(values)}
+            elif type(column) is tuple:
+                raise ValueError(f'the column "{db.column_names[coli]}" is not encoded')
+            else:
+                db._columns[coli] = list(column)
+
+        lengths = {len(column) for column in db._columns}
+        if len(lengths) > 1:
+            raise ValueError('all columns must have the same length')
+        db._size = lengths.pop() if lengths else 0
+        db._resize_slots(db._size)
+        # the rows are placed in the table of rows in one pass, leaving out the repeated tuples.
+        # the table holds indexes in kept_rows, which are the row numbers once those are dropped
+        slots, slot_hashes = db._slots, db._slot_hashes
+        mask = len(slots) - 1
+        all_columns = range(len(db.column_names))
+        kept_rows = []
+        values = [map(column[1].__getitem__, column[0]) if type(column) is tuple else column
+                  for column in columns]
+        for row, tup in enumerate(zip(*values)):
+            tup_hash = hash(tup)
+            slot = tup_hash & mask
+            while slots[slot] != -1 and not (slot_hashes[slot] == tup_hash
+                                             and db._row(kept_rows[slots[slot]], all_columns) == tup):
+                slot = (slot + 1) & mask
+            if slots[slot] == -1:
+                slots[slot] = len(kept_rows)
+                slot_hashes[slot] = tup_hash
+                kept_rows.append(row)
+        if len(kept_rows) < db._size:
+            for coli, column in enumerate(db._columns):
+                kept = [column[row] for row in kept_rows]
+                db._columns[coli] = array('l', kept) if coli in db._code_to_value else kept
+            db._size = len(kept_rows)
+
+        for coli, hash_index in db._hash_indexes.items():
+            get_value = db._column_getter(coli)
+            for row in range(db._size):
+                hash_index.setdefault(get_value(row), []).append(row)
+            db._sorted_keys[coli] = db._sorted_rows[coli] = None
+        return db
+
+    def export_column(self, column_name):
+        # returns the values of the column @column_name, in row order, in the format
+        # accepted by from_columns: a (codes, values) pair for encoded columns, and a list otherwise
+        self._verify_column_names([column_name], 'invalid column name')
+        coli = self.column_names.index(column_name)
+        if coli in self._code_to_value:
+            return self._columns[coli], list(self._code_to_value[coli])
+        return list(self._columns[coli])
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        # yields all of the tuples, in no particular order
+        all_columns = range(len(self.column_names))
+        return (self._row(row, all_columns) for row in range(self._size))
+
+    @property
+    def tuples(self):
+        return set(self)
+
+    def query(self, condition=None, restrict_to=None, sort_by=None, limit=None):
+        # returns a list of the tuples satisfying @condition, projected to the columns @restrict_to
+        # (all columns by default) and sorted by the columns @sort_by (not sorted by default)
+        # @condition is None (all tuples), a Condition (see eq, lt, gt, between, in_, all_of and
+        # make_query_condition) or a function which is called with every tuple.
+        # if @limit is given, only the first @limit tuples are returned; when sorting,
+        # they are selected with a heap instead of sorting all of the tuples.
+
+        plan = self._get_plan(condition, restrict_to, sort_by)
+        rows = self._matching_rows(condition, plan)
+        if plan.sort_key is not None:
+            if condition is None and plan.sorted_index is not None:
+                rows = self._get_sorted_index(plan.sorted_index)[1]
+                if limit is not None:
+                    rows = rows[:limit]
+            elif limit is not None:
+                rows = heapq.nsmallest(limit, rows, key=plan.sort_key)
+            else:
+                rows = sorted(rows, key=plan.sort_key)
+        elif limit is not None:
+            rows = itertools.islice(rows, limit)
+        project = plan.project
+        return [project(row) for row in rows]
+
+    def _get_plan(self, condition, restrict_to, sort_by):
+        # returns the _QueryPlan for a query with these arguments
+        # plans depend only on the shape of the query, so they are cached by it
+
+        shape = (condition.shape if isinstance(condition, Condition) else condition is None,
+                 None if restrict_to is None else frozenset(restrict_to),
+                 None if sort_by is None else frozenset(sort_by))
+        plan = self._plans.get(shape)
+        if plan is not None:
+            return plan
+
         if restrict_to is None:
             restrict_to = self.column_names_set
         else:
             self._verify_column_names(restrict_to, msg='restrict_to contains an invalid column name')
-            
         self._verify_column_names(sort_by, msg='sort_by contains an invalid column name')
-        
-        restrict_to = self._get_indicies(restrict_to)
-        filtered = (filter(condition, self.tuples) if condition is not None
-                    else iter(self.tuples))
-        if sort_by is None:
-            return [_project(tup, restrict_to) for tup in filtered]
-        else:
+        conjunct_indicies = []
+        if isinstance(condition, Condition):
+            for conjunct in condition.conjuncts():
+                self._verify_column_names(conjunct.column_names, 'the condition contains an invalid column name')
+                conjunct_indicies.append(self._get_indicies(conjunct.column_names))
+
+        plan = _QueryPlan()
+        plan.conjunct_indicies = conjunct_indicies
+        plan.project = self._projector(self._get_indicies(restrict_to))
+        plan.sort_key = plan.sorted_index = None
+        if sort_by is not None:
             sort_by = self._get_indicies(sort_by)
-            return [_project(tup, restrict_to) for tup in sorted(filtered, key=lambda tup: _project(tup, sort_by))]
+            if len(sort_by) == 1:
+                plan.sort_key = self._column_getter(sort_by[0])
+                if sort_by[0] in self._sorted_rows:
+                    plan.sorted_index = sort_by[0]
+            else:
+                plan.sort_key = self._projector(sort_by)
+
+        if len(self._plans) >= _PLAN_CACHE_SIZE:
+            self._plans.clear()
+        self._plans[shape] = plan
+        return plan
+
+    def _matching_rows(self, condition, plan):
+        # returns an iterable of the rows whose tuples satisfy @condition
+        # of the conditions in @condition which can be answered by an index, the one
+        # with the fewest rows is; the rest are compiled and checked only on those rows
+
+        if condition is None:
+            return range(self._size)
+        if not isinstance(condition, Condition):
+            all_columns = range(len(self.column_names))
+            return [row for row in range(self._size) if condition(self._row(row, all_columns))]
+
+        conjuncts = list(zip(condition.conjuncts(), plan.conjunct_indicies))
+        rows = None
+        for i, (conjunct, indicies) in enumerate(conjuncts):
+            candidates = self._index_lookup(conjunct, indicies)
+            if candidates is not None and (rows is None or len(candidates) < len(rows)):
+                rows, chosen = candidates, i
+        if rows is None:
+            rows = range(self._size)
+        else:
+            del conjuncts[chosen]
+
+        predicates = [self._compile(conjunct, indicies) for conjunct, indicies in conjuncts]
+        if not predicates:
+            return rows
+        if len(predicates) == 1:
+            return list(filter(predicates[0], rows))
+        return [row for row in rows if all(predicate(row) for predicate in predicates)]
+
+    def _index_lookup(self, condition, indicies):
+        # returns the rows satisfying @condition, found with the index of its column,
+        # or None if there is no such index (or the condition cannot use one)
+
+        kind, args = condition.kind, condition.args
+        if kind == 'predicate' or indicies[0] not in self._hash_indexes:
+            return None
+        coli = indicies[0]
+        if kind == 'eq':
+            return self._hash_indexes[coli].get(args, [])
+        if kind == 'in':
+            hash_index = self._hash_indexes[coli]
+            return [row for value in set(args) for row in hash_index.get(value, [])]
+        keys, rows = self._get_sorted_index(coli)
+        if kind == 'lt':
+            return rows[:bisect.bisect_left(keys, args)]
+        if kind == 'gt':
+            return rows[bisect.bisect_right(keys, args):]
+        low, high = args
+        return rows[bisect.bisect_left(keys, low):bisect.bisect_right(keys, high)]
+
+    def _compile(self, condition, indicies):
+        # returns a function which tells whether the tuple of a row satisfies @condition
+        # on dictionary-encoded columns, eq and in compare codes, so the values are not decoded
+
+        kind, args = condition.kind, condition.args
+        if kind == 'predicate':
+            getters = [self._column_getter(i) for i in indicies]
+            if len(getters) == 1:
+                get_value = getters[0]
+                return lambda row: args(get_value(row))
+            return lambda row: args(*[get_value(row) for get_value in getters])
+
+        coli = indicies[0]
+        if coli in self._value_to_code and kind in ('eq', 'in'):
+            column, value_to_code = self._columns[coli], self._value_to_code[coli]
+            if kind == 'eq':
+                code = value_to_code.get(args, -1)
+                return lambda row: column[row] == code
+            codes = {value_to_code[value] for value in args if value in value_to_code}
+            return lambda row: column[row] in codes
+
+        get_value = self._column_getter(coli)
+        if kind == 'eq':
+            return lambda row: get_value(row) == args
+        if kind == 'lt':
+            return lambda row: get_value(row) < args
+        if kind == 'gt':
+            return lambda row: get_value(row) > args
+        if kind == 'in':
+            values = set(args)
+            return lambda row: get_value(row) in values
+        low, high = args
+        return lambda row: low <= get_value(row) <= high
+
+    def _projector(self, indicies):
+        # returns a function which maps a row to its tuple projected to the columns @indicies
+        getters = [self._column_getter(i) for i in indicies]
+        return lambda row: tuple([get_value(row) for get_value in getters])
+
+    def _get_sorted_index(self, coli):
+        # returns the (keys, rows) pair of the sorted index of column @coli, rebuilding it if needed
+        if self._sorted_keys[coli] is None:
+            get_value = self._column_getter(coli)
+            rows = sorted(range(self._size), key=get_value)
+            self._sorted_rows[coli] = rows
+            self._sorted_keys[coli] = [get_value(row) for row in rows]
+        return self._sorted_keys[coli], self._sorted_rows[coli]
+
+    def _column_getter(self, coli):
+        # returns a function which maps a row to its value in column @coli
+        column = self._columns[coli]
+        if coli in self._code_to_value:
+            code_to_value = self._code_to_value[coli]
+            return lambda row: code_to_value[column[row]]
+        return column.__getitem__
+
+    def _row(self, row, indicies):
+        # returns the tuple with row number @row, projected to the columns @indicies
+        result = []
+        for i in indicies:
+            value = self._columns[i][row]
+            if i in self._code_to_value:
+                value = self._code_to_value[i][value]
+            result.append(value)
+        return tuple(result)
 
     def _verify_column_names(self, column_names, msg):
         # if @column_names is None, nothing happens
         # if a column in @column_names is not valid,
         # a ValueError will be raised with the message
         # @msg and an indication of the invalid column name
-        
+
         if column_names is not None:
             for column_name in column_names:
                 if column_name not in self.column_names_set:
                     raise ValueError(f'{msg}: "{column_name}"')
-            
+
     def _get_indicies(self, column_names_set):
         return sorted(self.column_names.index(name) for name in column_names_set)
-        
-    def make_query_condition(self, predicate, column_names='all'):
+
+    def make_query_condition(self, predicate=None, column_names='all', equal_to=_NOTHING, between=None):
+        # returns a condition which can be passed to self.query
+        # - if @predicate is given, the condition calls it with the values of the columns
+        #   @column_names (in the order of self.column_names) of each tuple.
+        # - if @equal_to is given, @column_names must name a single column and the condition
+        #   is satisfied by the tuples whose value in that column is equal to @equal_to.
+        # - if @between is a (low, high) pair, @column_names must name a single column and the
+        #   condition is satisfied by the tuples whose value v in that column is low <= v <= high.
+        # the last two kinds of conditions are answered from the index of the column, if there is one.
+
         if column_names == 'all':
             column_names = self.column_names_set
         else:
             self._verify_column_names(column_names, 'column_names contains an invalid column name')
-            
         indicies = self._get_indicies(column_names)
-        return lambda tup: predicate(*_project(tup, indicies))
-            
+        column_names = [self.column_names[i] for i in indicies]
+
+        if predicate is not None:
+            if equal_to is not _NOTHING or between is not None:
+                raise ValueError('a condition can have only one of predicate, equal_to and between')
+            condition = Condition('predicate', column_names, predicate)
+        elif (equal_to is _NOTHING) == (between is None):
+            raise ValueError('exactly one of predicate, equal_to and between must be given')
+        elif len(column_names) != 1:
+            raise ValueError(f'equal_to and between need a single column, but were given {len(column_names)}')
+        elif equal_to is not _NOTHING:
+            condition = eq(column_names[0], equal_to)
+        else:
+            low, high = between
+            condition = Condition('between', column_names, (low, high))
+        # the condition can also be called with a tuple of this database
+        condition.indicies = indicies
+        return condition
+
     def add_tuple(self, *tup):
         if len(tup) != len(self.column_names):
             raise ValueError(f'invalid length. expected {len(self.column_names)}, '
                              f'but was given {len(tup)} values')
-        self.tuples.add(tup)
+        tup_hash = hash(tup)
+        slot = self._find_slot(tup, tup_hash)
+        if self._slots[slot] != -1:
+            return
+        for listener in self._listeners:
+            listener(tup)
+
+        row = self._size
+        for coli, value in enumerate(tup):
+            if coli in self._value_to_code:
+                value_to_code = self._value_to_code[coli]
+                code = value_to_code.get(value)
+                if code is None:
+                    code = value_to_code[value] = len(value_to_code)
+                    self._code_to_value[coli].append(value)
+                self._columns[coli].append(code)
+            else:
+                self._columns[coli].append(value)
+        for coli, hash_index in self._hash_indexes.items():
+            value = tup[coli]
+            hash_index.setdefault(value, []).append(row)
+            keys = self._sorted_keys[coli]
+            if keys is not None:
+                if not keys or keys[-1] <= value:
+                    keys.append(value)
+                    self._sorted_rows[coli].append(row)
+                else:
+                    self._sorted_keys[coli] = self._sorted_rows[coli] = None
+        self._slots[slot] = row
+        self._slot_hashes[slot] = tup_hash
+        self._size += 1
+        if 3 * self._size > 2 * len(self._slots):
+            self._resize_slots(self._size)
+        for view in self._views.values():
+            view.add(tup)
+
+    def _find_slot(self, tup, tup_hash):
+        # returns the slot of the row of @tup, or the empty slot where it would be placed
+        slots, slot_hashes = self._slots, self._slot_hashes
+        mask = len(slots) - 1
+        slot = tup_hash & mask
+        all_columns = range(len(self.column_names))
+        while True:
+            row = slots[slot]
+            if row == -1 or (slot_hashes[slot] == tup_hash and self._row(row, all_columns) == tup):
+                return slot
+            slot = (slot + 1) & mask
+
+    def _place_row(self, row, tup_hash):
+        # puts @row, whose tuple is not in the table, in the first empty slot for @tup_hash
+        slots = self._slots
+        mask = len(slots) - 1
+        slot = tup_hash & mask
+        while slots[slot] != -1:
+            slot = (slot + 1) & mask
+        slots[slot] = row
+        self._slot_hashes[slot] = tup_hash
+
+    def _resize_slots(self, size):
+        # makes the table of rows big enough to be at most half full with @size rows
+        capacity = _MIN_SLOTS
+        while capacity < 2 * size:
+            capacity *= 2
+        occupied = [(row, tup_hash) for row, tup_hash in zip(self._slots, self._slot_hashes) if row != -1]
+        self._slots = array('q', [-1]) * capacity
+        self._slot_hashes = array('q', [0]) * capacity
+        for row, tup_hash in occupied:
+            self._place_row(row, tup_hash)
+
+    def create_view(self, name, group_by, value):
+        # creates a materialized view named @name, which groups the tuples by @group_by and
+        # keeps the count, sum, minimum and maximum of @value within each group.
+        # @group_by is a collection of column names or a function of a tuple returning the group key.
+        # @value is a column name or a function of a tuple returning a number.
+        # the view is computed from the current tuples once, and then each add_tuple updates it in O(1)
+
+        if callable(group_by):
+            key = group_by
+        else:
+            self._verify_column_names(group_by, 'group_by contains an invalid column name')
+            indicies = self._get_indicies(group_by)
+            key = lambda tup: _project(tup, indicies)
+        if callable(value):
+            get_value = value
+        else:
+            self._verify_column_names([value], 'invalid value column')
+            coli = self.column_names.index(value)
+            get_value = lambda tup: tup[coli]
+
+        view = _View(key, get_value)
+        for tup in self:
+            view.add(tup)
+        self._views[name] = view
+
+    def view(self, name):
+        # returns a dict mapping every group key of the view @name to its Aggregate
+        view = self._views.get(name)
+        if view is None:
+            raise ValueError(f'there is no view named "{name}"')
+        return {key: Aggregate(*aggregates) for key, aggregates in view.groups.items()}
+
+    def add_listener(self, listener):
+        # @listener will be called with every new tuple, before it is added
+        # if @listener raises an exception, the tuple is not added
+        self._listeners.append(listener)
+
+    def add_tuples(self, tuples):
+        # adds every tuple of the iterable @tuples
+        for tup in tuples:
+            self.add_tuple(*tup)
 
     def __str__(self):
         names_str = ' '.join(self.column_names)
-        tuples_str = '\n'.join(map(str, self.tuples))
+        tuples_str = '\n'.join(map(str, self))
         return f'{names_str}\n{tuples_str}'
-    
+
+class _View:
+    # the aggregates of a view: self.groups maps each group key to a [count, total, minimum, maximum] list
+    def __init__(self, key, get_value):
+        self.key = key
+        self.get_value = get_value
+        self.groups = {}
+
+    def add(self, tup):
+        key, value = self.key(tup), self.get_value(tup)
+        aggregates = self.groups.get(key)
+        if aggregates is None:
+            self.groups[key] = [1, value, value, value]
+        else:
+            aggregates[0] += 1
+            aggregates[1] += value
+            if value < aggregates[2]:
+                aggregates[2] = value
+            if value > aggregates[3]:
+                aggregates[3] = value
+
+class _QueryPlan:
+    # the parts of a query which depend only on its shape (see Database._get_plan):
+    # - conjunct_indicies: the column indexes of each conjunct of the condition
+    # - project: maps a row to its tuple, projected to the restrict_to columns
+    # - sort_key: maps a row to its sort key, or None if the result is not sorted
+    # - sorted_index: the column whose sorted index gives the sort order, or None
+    pass
+
+class Condition:
+    # a declarative query condition. build it with eq, lt, gt, between, in_, all_of
+    # or Database.make_query_condition, and pass it to Database.query.
+    # @kind is one of 'eq', 'lt', 'gt', 'between', 'in', 'predicate' and 'and'.
+    # for 'and', @args are the conditions which must all hold.
+    # otherwise @column_names are the columns the condition looks at and @args are its parameters
+    # (the value, the (low, high) pair, the collection of values or the predicate).
+    # self.shape identifies the condition without its parameters; queries with the same
+    # shape share a plan.
+    # self.indicies are the positions of @column_names in the tuples the condition can be called with;
+    # they are known only for the conditions made by Database.make_query_condition.
+
+    def __init__(self, kind, column_names, args):
+        self.kind = kind
+        self.column_names = tuple(column_names)
+        self.args = args
+        self.indicies = None
+        if kind == 'and':
+            self.shape = ('and', tuple(condition.shape for condition in args))
+        else:
+            self.shape = (kind, self.column_names)
+
+    def __call__(self, tup):
+        # tells whether @tup, a tuple of the database which made the condition, satisfies it
+        if self.indicies is None:
+            raise ValueError('only a condition made by Database.make_query_condition can be called with a tuple')
+        values = _project(tup, self.indicies)
+        kind, args = self.kind, self.args
+        if kind == 'predicate':
+            return args(*values)
+        value = values[0]
+        if kind == 'eq':
+            return value == args
+        if kind == 'lt':
+            return value < args
+        if kind == 'gt':
+            return value > args
+        if kind == 'between':
+            low, high = args
+            return low <= value <= high
+        return value in args
+
+    def conjuncts(self):
+        # returns the list of conditions (none of which is an 'and') which must all hold for @self to hold
+        if self.kind != 'and':
+            return [self]
+        return [conjunct for condition in self.args for conjunct in condition.conjuncts()]
+
+def eq(column_name, value):
+    # the value in the column @column_name is equal to @value
+    return Condition('eq', [column_name], value)
+
+def lt(column_name, value):
+    # the value in the column @column_name is less than @value
+    return Condition('lt', [column_name], value)
+
+def gt(column_name, value):
+    # the value in the column @column_name is greater than @value
+    return Condition('gt', [column_name], value)
+
+def between(column_name, low, high):
+    # the value v in the column @column_name satisfies low <= v <= high
+    return Condition('between', [column_name], (low, high))
+
+def in_(column_name, values):
+    # the value in the column @column_name is one of @values
+    return Condition('in', [column_name], tuple(values))
+
+def all_of(*conditions):
+    # all of the @conditions hold
+    return Condition('and', (), conditions)
+
 def _project(tup, indicies):
     return tuple(tup[i] for i in indicies)
@@ -0,0 +1,140 @@
+import os
+import sys
+import struct
+import datetime
+from array import array
+import constants
+import parse
+
+# a snapshot is a binary copy of a ledger database, which loads without parsing text.
+# layout (all integers little-endian in the header; the arrays use the byte order of the header flag):
+#   header: HEADER_FORMAT (see below)
+#   the category table: the distinct categories, utf-8 encoded and separated by newlines
+#   the type table: the distinct types, utf-8 encoded and separated by newlines
+#   dates: array('i') of date ordinals
+#   amounts: array('q') of amounts multiplied by constants.SNAPSHOT_AMOUNT_SCALE
+#   kinds: array('b'), 0 if the amount is an int and 1 if it is a float
+#   categories: array('i') of indexes in the category table
+#   types: array('b') of indexes in the type table
+# a snapshot records the size and the modification time of the ledger it was made from,
+# and it is used only while the ledger still has them.
+
+MAGIC = b'MTSNAP01'
+# magic, little endian arrays, source size, source mtime in ns, rows, category table bytes, type table bytes
+HEADER_FORMAT = '<8s?7xQqQQQ'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+INT_KIND = 0
+FLOAT_KIND = 1
+
+def snapshot_filename(filename):
+    return filename + constants.SNAPSHOT_SUFFIX
+
+def read_database(filename, workers=1):
+    # returns the database of the ledger @filename
+    # it is loaded from the snapshot of the ledger when that is up to date; otherwise the
+    # ledger is parsed (as parse.read_database_from_file does) and the snapshot is written again
+    db = read_snapshot(filename)
+    if db is None:
+        # the ledger is stat'ed before it is parsed, so that a change made while parsing
+        # leaves the snapshot stale instead of marking the old contents as up to date
+        source = os.stat(filename)
+        db = parse.read_database_from_file(filename, workers)
+        write_snapshot(db, filename, source)
+    return db
+
+def read_snapshot(filename):
+    # returns the database in the snapshot of the ledger @filename, or None
+    # if there is no snapshot, it is corrupt, or the ledger was modified after it was written
+    try:
+        with open(snapshot_filename(filename), 'rb') as f:
+            data = f.read()
+        source = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    if len(data) < HEADER_SIZE:
+        return None
+    (magic, little_endian, source_size, source_mtime,
+     rows, categories_nbytes, types_nbytes) = struct.unpack_from(HEADER_FORMAT, data)
+    if (magic != MAGIC or little_endian != (sys.byteorder == 'little')
+        or (source_size, source_mtime) != (source.st_size, source.st_mtime_ns)):
+        return None
+
+    view = memoryview(data)
+    offset = HEADER_SIZE
+
+    def read_table(nbytes):
+        nonlocal offset
+        text = str(view[offset:offset + nbytes], 'utf-8')
+        offset += nbytes
+        return text.split('\n') if text else []
+
+    def read_array(typecode):
+        nonlocal offset
+        result = array(typecode)
+        nbytes = rows * result.itemsize
+        result.frombytes(view[offset:offset + nbytes])
+        offset += nbytes
+        return result
+
+    try:
+        category_table = read_table(categories_nbytes)
+        type_table = read_table(types_nbytes)
+        ordinals, amounts, kinds = read_array('i'), read_array('q'), read_array('b')
+        category_codes, type_codes = read_array('i'), read_array('b')
+    except ValueError:
+        return None
+    if offset != len(data):
+        return None
+
+    dates = {}
+    for ordinal in set(ordinals):
+        dates[ordinal] = datetime.date.fromordinal(ordinal)
+    scale = constants.SNAPSHOT_AMOUNT_SCALE
+    columns = {'date': [dates[ordinal] for ordinal in ordinals],
+               'amount': [amount // scale if kind == INT_KIND else amount / scale
+                          for amount, kind in zip(amounts, kinds)],
+               'category': (category_codes, category_table),
+               'type': (type_codes, type_table)}
+    return parse.new_database_from_columns([columns[name] for name in constants.COLUMN_NAMES])
+
+def write_snapshot(db, filename, source=None):
+    # writes the snapshot of @db, which must be the database of the ledger @filename as it is on disk
+    # @source is the os.stat of the ledger taken before @db was read from it; by default it is taken now
+    # returns False (and removes any old snapshot) if some amount cannot be stored exactly
+
+    scale = constants.SNAPSHOT_AMOUNT_SCALE
+    amounts, kinds = array('q'), array('b')
+    try:
+        for amount in db.export_column('amount'):
+            scaled = round(amount * scale)
+            if scaled / scale != amount:
+                raise OverflowError
+            amounts.append(scaled)
+            kinds.append(INT_KIND if type(amount) is int else FLOAT_KIND)
+    except OverflowError:
+        try:
+            os.remove(snapshot_filename(filename))
+        except FileNotFoundError:
+            pass
+        return False
+
+    ordinals = array('i', (date.toordinal() for date in db.export_column('date')))
+    category_codes, category_table = db.export_column('category')
+    type_codes, type_table = db.export_column('type')
+    categories_bytes = '\n'.join(category_table).encode('utf-8')
+    types_bytes = '\n'.join(type_table).encode('utf-8')
+    if source is None:
+        source = os.stat(filename)
+    header = struct.pack(HEADER_FORMAT, MAGIC, sys.byteorder == 'little', source.st_size, source.st_mtime_ns,
+                         len(db), len(categories_bytes), len(types_bytes))
+
+    tmp_filename = snapshot_filename(filename) + '.tmp'
+    with open(tmp_filename, 'wb') as f:
+        f.write(header)
+        f.write(categories_bytes)
+        f.write(types_bytes)
+        for column in (ordinals, amounts, kinds, array('i', category_codes), array('b', type_codes)):
+            column.tofile(f)
+    os.replace(tmp_filename, snapshot_filename(filename))
+    return True
@@ -0,0 +1,51 @@
+import constants
+import parse
+
+# the names of the materialized views of a ledger database
+BY_CATEGORY_VIEW = 'by_category'
+BY_DATE_VIEW = 'by_date'
+BY_MONTH_VIEW = 'by_month'
+
+def create_views(db):
+    # creates the views used by the summary on the ledger database @db:
+    # - BY_CATEGORY_VIEW: amounts grouped by (category, type)
+    # - BY_DATE_VIEW: signed amounts grouped by date
+    # - BY_MONTH_VIEW: signed amounts (incomes positive, expenses negative) grouped by (year, month)
+    db.create_view(BY_CATEGORY_VIEW, group_by={'category', 'type'}, value='amount')
+    db.create_view(BY_DATE_VIEW, group_by={'date'}, value=signed_amount)
+    db.create_view(BY_MONTH_VIEW, group_by=lambda tup: (tup[0].year, tup[0].month), value=signed_amount)
+
+def signed_amount(tup):
+    _, amount, _, _type = tup
+    return amount if _type == constants.INCOME_STR else -amount
+
+def monthly_balances(db):
+    # returns a list of (year, month, net, balance) tuples, one for each month with data, in order.
+    # net is the incomes minus the expenses in the month and
+    # balance is the sum of the nets of all months up to and including this one
+    result = []
+    balance = 0
+    for (year, month), aggregate in sorted(db.view(BY_MONTH_VIEW).items()):
+        balance += aggregate.total
+        result.append((year, month, aggregate.total, balance))
+    return result
+
+def daily_totals(db):
+    # returns a list of (date, count, net) tuples, one for each date with data, in order.
+    # count is the number of entries on the date and net is the incomes minus the expenses on it
+    return [(date, aggregate.count, aggregate.total) for (date,), aggregate in sorted(db.view(BY_DATE_VIEW).items())]
+
+def summary_to_str(db):
+    lines = ['category, type: count, total, min, max']
+    for (category, _type), aggregate in sorted(db.view(BY_CATEGORY_VIEW).items()):
+        lines.append(f'{category}, {_type}: {aggregate.count}, {aggregate.total}, '
+                     f'{aggregate.minimum}, {aggregate.maximum}')
+    lines.append('')
+    lines.append('month: net, balance')
+    for year, month, net, balance in monthly_balances(db):
+        lines.append(f'{month}-{year}: {net}, {balance}')
+    lines.append('')
+    lines.append('date: entries, net')
+    for date, count, net in daily_totals(db):
+        lines.append(f'{parse.date_to_str(date)}: {count}, {net}')
+    return '\n'.join(lines)
@@ -0,0 +1,73 @@
+import os
+import datetime
+import tempfile
+import unittest
+import constants
+import parse
+from journal import Journal
+
+INC, EXP = constants.INCOME_STR, constants.EXPENSE_STR
+
+LEDGER = '''=== 1-1-2001 ===
+5, food, New Expense
+=== 3-1-2001 ===
+100, salary, New Income
+'''
+
+class JournalTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.dir.name, 'ledger')
+        with open(self.filename, 'w') as f:
+            f.write(LEDGER)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def reopen(self):
+        journal = Journal(self.filename)
+        db = journal.open_database()
+        tuples = db.tuples
+        journal.close()
+        return tuples
+
+    def test_replay(self):
+        journal = Journal(self.filename)
+        db = journal.open_database()
+        added = [(datetime.date(2001, 1, 2), 7, 'books', EXP),
+                 (datetime.date(2000, 12, 31), 1.5, 'gift', INC)]
+        db.add_tuples(added)
+        expected = db.tuples
+        journal.close()
+        self.assertEqual(self.reopen(), expected)
+        self.assertEqual(len(expected), 4)
+
+    def test_compact(self):
+        journal = Journal(self.filename)
+        db = journal.open_database()
+        db.add_tuples([(datetime.date(2001, 1, 2), 7, 'books', EXP),
+                       (datetime.date(2000, 12, 31), 1.5, 'gift', INC)])
+        expected = db.tuples
+        journal.compact()
+        db.add_tuple(datetime.date(2001, 1, 4), 2, 'bus', EXP)
+        expected.add((datetime.date(2001, 1, 4), 2, 'bus', EXP))
+        journal.close()
+
+        with open(self.filename) as f:
+            dates = [date for date, *rest in parse.generate_records(f)]
+        self.assertEqual(dates, sorted(dates))
+        self.assertEqual(len(dates), 4)
+        self.assertEqual(self.reopen(), expected)
+
+    def test_torn_write(self):
+        with open(self.filename + constants.WAL_SUFFIX, 'w') as f:
+            f.write('=== 2-1-2001 ===\n3, fo')
+        journal = Journal(self.filename)
+        db = journal.open_database()
+        db.add_tuple(datetime.date(2001, 1, 4), 2, 'bus', EXP)
+        expected = db.tuples
+        journal.close()
+        self.assertEqual(self.reopen(), expected)
+        self.assertEqual(len(expected), 3)
+
+unittest.main()
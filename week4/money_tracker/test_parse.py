@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+import constants
+import parse
+import generate_ledger
+
+class ParallelParseTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.dir.name, 'ledger')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def serial_error(self):
+        try:
+            parse.read_database_from_file(self.filename)
+        except ValueError as e:
+            return str(e)
+        self.fail('the serial parser accepted the ledger')
+
+    def assertSameError(self, workers):
+        expected = self.serial_error()
+        with self.assertRaises(ValueError) as context:
+            parse.read_database_from_file_parallel(self.filename, workers)
+        self.assertEqual(str(context.exception), expected)
+
+    def test_same_database(self):
+        generate_ledger.write_ledger(self.filename, 3000, days=100)
+        # a repeated tuple in another chunk
+        with open(self.filename) as f:
+            first_lines = [next(f), next(f)]
+        with open(self.filename, 'a') as f:
+            f.writelines(first_lines)
+        serial = parse.read_database_from_file(self.filename)
+        for workers in (1, 2, 3):
+            parallel = parse.read_database_from_file_parallel(self.filename, workers)
+            self.assertEqual(len(parallel), len(serial))
+            self.assertEqual(parallel.tuples, serial.tuples)
+            self.assertEqual(parse.db_to_str(parallel), parse.db_to_str(serial))
+
+    def test_same_error_line(self):
+        generate_ledger.write_ledger(self.filename, 3000, days=100)
+        with open(self.filename) as f:
+            lines = f.readlines()
+        for line_index in (0, 1, len(lines) // 3, len(lines) // 2 + 1, len(lines) - 1):
+            for bad_line in ('nonsense\n', '=== 31-2-2001 ===\n', f'-1, food, {constants.EXPENSE_STR}\n'):
+                with open(self.filename, 'w') as f:
+                    f.writelines(lines[:line_index] + [bad_line] + lines[line_index + 1:])
+                for workers in (2, 3):
+                    self.assertSameError(workers)
+
+    def test_empty_ledger(self):
+        open(self.filename, 'w').close()
+        self.assertSameError(2)
+
+unittest.main()
@@ -0,0 +1,47 @@
+import os
+import datetime
+import tempfile
+import unittest
+import constants
+import parse
+from server import LedgerServer
+
+class ExecuteTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.db = parse.new_database()
+        self.server = LedgerServer(os.path.join(self.dir.name, 'socket'), self.db, None)
+
+    def tearDown(self):
+        self.server.server_close()
+        self.dir.cleanup()
+
+    def assertError(self, request):
+        answer = self.server.execute(request)
+        self.assertFalse(answer['ok'], request)
+        self.assertIsInstance(answer['error'], str)
+
+    def test_add(self):
+        answer = self.server.execute({'command': 'add', 'type': 'income', 'date': '2-1-2001',
+                                      'amount': 10, 'category': 'salary'})
+        self.assertEqual(answer, {'ok': True, 'result': None})
+        self.assertEqual(self.db.tuples, {(datetime.date(2001, 1, 2), 10, 'salary', constants.INCOME_STR)})
+
+    def test_malformed_requests(self):
+        add = {'command': 'add', 'type': 'income', 'date': '1-1-2001', 'amount': 1, 'category': 'x'}
+        requests = [[], 'add', None, {}, {'command': None}, {'command': ['add']}, {'command': 'nothing'},
+                    {'command': 'date'}, {'command': 'date', 'date': 'today'},
+                    {'command': 'date', 'date': '1-1-99999999999999999999'},
+                    {**add, 'date': '1-1-99999999999999999999'}, {**add, 'date': '99999999999999999999-1-1'},
+                    {**add, 'date': '31-2-2001'}, {**add, 'type': 'gift'}, {**add, 'type': {}},
+                    {**add, 'amount': -1}, {**add, 'amount': 'much'}, {**add, 'category': ''}]
+        for request in requests:
+            self.assertError(request)
+        for name in ('type', 'date', 'amount', 'category'):
+            request = dict(add)
+            del request[name]
+            self.assertError(request)
+        self.assertEqual(len(self.db), 0)
+        self.assertFalse(self.server.stopping)
+
+unittest.main()
@@ -0,0 +1,109 @@
+import random
+import unittest
+from simple_database import *
+
+COLUMN_NAMES = ('date', 'category', 'amount')
+
+def random_tuples(rand, count):
+    return [(rand.randrange(20), rand.choice(['food', 'rent', 'fun']), rand.randrange(-5, 50)) for i in range(count)]
+
+def reference_query(tuples, predicate=None, restrict_to=COLUMN_NAMES):
+    # what the set-based database returned: the distinct tuples satisfying @predicate, projected
+    indicies = [COLUMN_NAMES.index(name) for name in restrict_to]
+    return sorted(tuple(tup[i] for i in indicies) for tup in set(tuples) if predicate is None or predicate(tup))
+
+class TestDatabase(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(0)
+        self.tuples = random_tuples(self.rand, 2000)
+        self.databases = [Database(COLUMN_NAMES, self.tuples),
+                          Database(COLUMN_NAMES, self.tuples, encoded_columns={'category'}),
+                          Database(COLUMN_NAMES, self.tuples, encoded_columns={'category'},
+                                   indexed_columns={'date', 'amount'})]
+
+    def test_duplicates(self):
+        for db in self.databases:
+            self.assertEqual(len(db), len(set(self.tuples)))
+            self.assertEqual(db.tuples, set(self.tuples))
+            db.add_tuple(*self.tuples[0])
+            db.add_tuples(self.tuples[:100])
+            self.assertEqual(len(db), len(set(self.tuples)))
+            db.add_tuple(100, 'food', 1)
+            self.assertEqual(db.tuples, set(self.tuples) | {(100, 'food', 1)})
+        self.assertRaises(ValueError, Database(COLUMN_NAMES, ()).add_tuple, 1, 'food')
+
+    def test_duplicates_with_equal_hashes(self):
+        # the rows of tuples with the same hash are told apart by their values
+        class Value:
+            def __init__(self, value):
+                self.value = value
+            def __eq__(self, other):
+                return self.value == other.value
+            def __hash__(self):
+                return 0
+        values = [Value(i % 300) for i in range(1000)]
+        db = Database(('value',), [(value,) for value in values])
+        self.assertEqual(len(db), 300)
+        self.assertEqual(len(Database.from_columns(('value',), [values[:300]])), 300)
+        self.assertEqual(len(Database.from_columns(('value',), [values])), 300)
+
+    def test_query(self):
+        conditions = [(eq('date', 3), lambda tup: tup[0] == 3),
+                      (lt('amount', 10), lambda tup: tup[2] < 10),
+                      (gt('amount', 40), lambda tup: tup[2] > 40),
+                      (between('date', 5, 8), lambda tup: 5 <= tup[0] <= 8),
+                      (in_('category', ['rent', 'fun', 'none']), lambda tup: tup[1] in ('rent', 'fun')),
+                      (all_of(eq('category', 'food'), between('amount', 0, 20), lt('date', 10)),
+                       lambda tup: tup[1] == 'food' and 0 <= tup[2] <= 20 and tup[0] < 10)]
+        for db in self.databases:
+            self.assertEqual(sorted(db.query()), reference_query(self.tuples))
+            for condition, predicate in conditions:
+                self.assertEqual(sorted(db.query(condition)), reference_query(self.tuples, predicate))
+                self.assertEqual(sorted(db.query(condition, restrict_to={'amount', 'date'})),
+                                 reference_query(self.tuples, predicate, ('date', 'amount')))
+                result = db.query(condition, sort_by={'amount'})
+                self.assertEqual(sorted(result), reference_query(self.tuples, predicate))
+                self.assertEqual([tup[2] for tup in result], sorted(tup[2] for tup in result))
+                self.assertEqual(db.query(condition, sort_by={'amount'}, limit=5), result[:5])
+            condition = db.make_query_condition(lambda date, amount: date == amount, {'date', 'amount'})
+            self.assertEqual(sorted(db.query(condition)), reference_query(self.tuples, lambda tup: tup[0] == tup[2]))
+
+    def test_calling_conditions(self):
+        # the conditions of make_query_condition also work as predicates of a tuple
+        db = self.databases[0]
+        conditions = [(db.make_query_condition(lambda date, amount: date == amount, {'date', 'amount'}),
+                       lambda tup: tup[0] == tup[2]),
+                      (db.make_query_condition(column_names={'category'}, equal_to='food'),
+                       lambda tup: tup[1] == 'food'),
+                      (db.make_query_condition(column_names={'amount'}, between=(10, 20)),
+                       lambda tup: 10 <= tup[2] <= 20)]
+        for condition, predicate in conditions:
+            self.assertEqual([condition(tup) for tup in self.tuples], [predicate(tup) for tup in self.tuples])
+            self.assertEqual(sorted(db.query(condition)), reference_query(self.tuples, predicate))
+        self.assertRaises(ValueError, eq('date', 3), self.tuples[0])
+
+    def test_index_lookups_after_adding(self):
+        # tuples added out of order drop the sorted indexes, which are rebuilt for the next query
+        db = self.databases[-1]
+        added = random_tuples(self.rand, 500)
+        db.add_tuples(added)
+        self.assertEqual(sorted(db.query(between('amount', 10, 12))),
+                         reference_query(self.tuples + added, lambda tup: 10 <= tup[2] <= 12))
+        self.assertEqual(sorted(db.query(eq('date', 7))), reference_query(self.tuples + added, lambda tup: tup[0] == 7))
+
+    def test_from_columns(self):
+        for db in self.databases:
+            columns = [db.export_column(name) for name in COLUMN_NAMES]
+            copy = Database.from_columns(COLUMN_NAMES, columns, encoded_columns={'category'},
+                                         indexed_columns={'date'})
+            self.assertEqual(copy.tuples, db.tuples)
+            self.assertEqual(sorted(copy.query(eq('date', 4))), reference_query(self.tuples, lambda tup: tup[0] == 4))
+            copy.add_tuple(*self.tuples[0])
+            self.assertEqual(len(copy), len(db))
+        # repeated tuples are dropped, keeping the first
+        columns = [list(column) for column in zip(*(self.tuples + self.tuples[::-1]))]
+        copy = Database.from_columns(COLUMN_NAMES, columns, encoded_columns={'category'}, indexed_columns={'date'})
+        self.assertEqual(list(copy), list(dict.fromkeys(self.tuples)))
+        self.assertEqual(sorted(copy.query(eq('date', 4))), reference_query(self.tuples, lambda tup: tup[0] == 4))
+
+unittest.main()
@@ -0,0 +1,65 @@
+import os
+import datetime
+import tempfile
+import unittest
+import constants
+import parse
+import snapshot
+
+LEDGER = '''=== 1-1-2001 ===
+5, food, New Expense
+2.25, bus, New Expense
+=== 3-1-2001 ===
+100, salary, New Income
+=== 1-2-2001 ===
+0.5, food, New Expense
+'''
+
+class SnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.dir.name, 'ledger')
+        self.write_ledger(LEDGER)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write_ledger(self, text):
+        with open(self.filename, 'w') as f:
+            f.write(text)
+
+    def test_round_trip(self):
+        expected = parse.read_database_from_file(self.filename)
+        db = snapshot.read_database(self.filename)
+        self.assertTrue(os.path.exists(snapshot.snapshot_filename(self.filename)))
+        loaded = snapshot.read_snapshot(self.filename)
+        self.assertEqual(loaded.tuples, expected.tuples)
+        self.assertEqual(db.tuples, expected.tuples)
+        # the type of the amounts survives too
+        self.assertEqual(sorted(map(type, loaded.export_column('amount')), key=str),
+                         sorted(map(type, expected.export_column('amount')), key=str))
+        self.assertEqual(len(loaded.query(loaded.make_query_condition(column_names={'category'},
+                                                                     equal_to='food'))), 2)
+
+    def test_stale_snapshot(self):
+        snapshot.read_database(self.filename)
+        self.write_ledger(LEDGER + '1, tea, New Expense\n')
+        self.assertIsNone(snapshot.read_snapshot(self.filename))
+        db = snapshot.read_database(self.filename)
+        self.assertIn((datetime.date(2001, 2, 1), 1, 'tea', constants.EXPENSE_STR), db.tuples)
+        self.assertEqual(snapshot.read_snapshot(self.filename).tuples, db.tuples)
+
+    def test_ledger_changed_while_reading(self):
+        source = os.stat(self.filename)
+        db = parse.read_database_from_file(self.filename)
+        self.write_ledger(LEDGER + '1, tea, New Expense\n')
+        snapshot.write_snapshot(db, self.filename, source)
+        self.assertIsNone(snapshot.read_snapshot(self.filename))
+
+    def test_corrupt_snapshot(self):
+        snapshot.read_database(self.filename)
+        with open(snapshot.snapshot_filename(self.filename), 'r+b') as f:
+            f.truncate(snapshot.HEADER_SIZE + 3)
+        self.assertIsNone(snapshot.read_snapshot(self.filename))
+
+unittest.main()
@@ -0,0 +1,58 @@
+import random
+import datetime
+import unittest
+import constants
+import parse
+import summary
+
+INC, EXP = constants.INCOME_STR, constants.EXPENSE_STR
+
+def random_tuples(rand, count):
+    return [(datetime.date(2000, 1, 1) + datetime.timedelta(days=rand.randrange(120)),
+             rand.randint(1, 50), rand.choice(('food', 'rent', 'salary')), rand.choice((INC, EXP)))
+            for i in range(count)]
+
+class TestViews(unittest.TestCase):
+    def setUp(self):
+        rand = random.Random(3)
+        self.tuples = random_tuples(rand, 400)
+        self.added = random_tuples(rand, 200) + self.tuples[:50]
+
+    def test_incremental_updates(self):
+        # views created before adding tuples agree with views created after adding them
+        db = parse.new_database()
+        db.add_tuples(self.tuples)
+        summary.create_views(db)
+        db.add_tuples(self.added)
+        fresh = parse.new_database()
+        fresh.add_tuples(self.tuples + self.added)
+        summary.create_views(fresh)
+        for name in (summary.BY_CATEGORY_VIEW, summary.BY_DATE_VIEW, summary.BY_MONTH_VIEW):
+            self.assertEqual(db.view(name), fresh.view(name))
+        self.assertEqual(summary.summary_to_str(db), summary.summary_to_str(fresh))
+
+    def test_aggregates(self):
+        db = parse.new_database()
+        summary.create_views(db)
+        db.add_tuples(self.tuples + self.added)
+        distinct = set(self.tuples + self.added)
+
+        for (category, _type), aggregate in db.view(summary.BY_CATEGORY_VIEW).items():
+            amounts = [tup[1] for tup in distinct if tup[2] == category and tup[3] == _type]
+            self.assertEqual((aggregate.count, aggregate.total, aggregate.minimum, aggregate.maximum),
+                             (len(amounts), sum(amounts), min(amounts), max(amounts)))
+
+        dates = sorted({tup[0] for tup in distinct})
+        self.assertEqual(summary.daily_totals(db),
+                         [(date, sum(1 for tup in distinct if tup[0] == date),
+                           sum(summary.signed_amount(tup) for tup in distinct if tup[0] == date))
+                          for date in dates])
+
+        balance = 0
+        for year, month, net, month_balance in summary.monthly_balances(db):
+            expected = sum(summary.signed_amount(tup) for tup in distinct
+                           if (tup[0].year, tup[0].month) == (year, month))
+            balance += expected
+            self.assertEqual((net, month_balance), (expected, balance))
+
+unittest.main()
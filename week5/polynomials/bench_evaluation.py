@@ -0,0 +1,46 @@
+import sys
+import time
+import random
+import polynomial
+from polynomial import Polynomial
+
+# compares evaluating a polynomial at many points with Polynomial.evaluate, the compiled
+# evaluator, numpy (when it is installed) and the subproduct tree of multipoint_evaluate
+# usage: bench_evaluation.py [number of float points]
+
+DEGREE = 50
+MULTIPOINT_SIZES = (64, 128, 256, 512)
+
+def time_it(proc):
+    start = time.perf_counter()
+    result = proc()
+    return time.perf_counter() - start, result
+
+def random_polynomial(degree, rand):
+    return Polynomial.from_coeffs(rand.randrange(-1000, 1001) for i in range(degree + 1))
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    rand = random.Random(0)
+    poly = random_polynomial(DEGREE, rand)
+    xs = [rand.uniform(-1, 1) for i in range(count)]
+    print(f'degree {DEGREE}, {count} float points:')
+    evaluate_time, expected = time_it(lambda: list(map(poly.evaluate, xs)))
+    print(f'    evaluate {evaluate_time:.2f}s')
+    compiled_time, values = time_it(lambda: list(map(poly.compile_evaluator(), xs)))
+    assert values == expected
+    print(f'    compiled {compiled_time:.2f}s ({evaluate_time / compiled_time:.1f}x)')
+    if polynomial.numpy is not None:
+        numpy_time, values = time_it(lambda: poly.evaluate_many(polynomial.numpy.array(xs)))
+        print(f'    numpy {numpy_time:.2f}s ({evaluate_time / numpy_time:.1f}x)')
+    for size in MULTIPOINT_SIZES:
+        poly = random_polynomial(size - 1, rand)
+        points = [rand.randrange(-1000, 1001) for i in range(size)]
+        compiled_time, expected = time_it(lambda: poly.evaluate_many(points))
+        multipoint_time, values = time_it(lambda: poly.evaluate_multipoint(points))
+        assert values == expected
+        print(f'degree {size - 1}, {size} int points: compiled {compiled_time:.3f}s, '
+              f'subproduct tree {multipoint_time:.3f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import sys
+import time
+import random
+import polynomial
+
+# compares the multiplication of dense coefficient lists by the schoolbook method, Karatsuba's method
+# and numpy's FFT (when numpy is installed), by degree
+# usage: bench_multiplication.py [largest degree]
+
+MAX_COEFF = 1000
+
+def random_coeffs(length, rand):
+    return [rand.randrange(-MAX_COEFF, MAX_COEFF + 1) for i in range(length)]
+
+def time_it(proc):
+    start = time.perf_counter()
+    result = proc()
+    return time.perf_counter() - start, result
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 2 ** 14
+    rand = random.Random(0)
+    degree = 16
+    while degree <= largest:
+        coeffs1, coeffs2 = random_coeffs(degree + 1, rand), random_coeffs(degree + 1, rand)
+        times = []
+        karatsuba_time, expected = time_it(lambda: polynomial.karatsuba_product(coeffs1, coeffs2))
+        if degree <= 2 ** 12:
+            schoolbook_time, product = time_it(lambda: polynomial.schoolbook_product(coeffs1, coeffs2))
+            assert product == expected
+            times.append(f'schoolbook {schoolbook_time:.4f}s')
+        times.append(f'karatsuba {karatsuba_time:.4f}s')
+        if polynomial.numpy is not None:
+            fft_time, product = time_it(lambda: polynomial.fft_product(coeffs1, coeffs2))
+            assert product == expected
+            times.append(f'fft {fft_time:.4f}s')
+        print(f'degree {degree}: ' + ', '.join(times))
+        degree *= 2
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,41 @@
 import itertools
+import operator
+import math
 import re
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# polynomials of at least this degree with at least this fraction of nonzero terms are stored densely
+DENSE_MIN_DEGREE = 64
+DENSE_MIN_DENSITY = 0.5
+# coefficient lists at most this long are multiplied by the schoolbook method instead of Karatsuba's
+KARATSUBA_THRESHOLD = 32
+# coefficient lists at least this long are multiplied with numpy's FFT, when it is exact (see fft_product)
+FFT_THRESHOLD = 32
+# fft_product is used only if (the largest possible coefficient of the product) * log2(FFT size)
+# is less than this, so that the rounding errors of the floats are far less than 1/2
+FFT_MAX_BOUND = 2 ** 46
+FFT_MAX_ROUNDING_ERROR = 1 / 8
+# evaluate_many compiles a function of straight-line code for polynomials with at most this many terms
+# (and loops over the terms for the others)
+COMPILED_MAX_TERMS = 1000
+# the leaves of the subproduct trees of multipoint_evaluate have this many points
+MULTIPOINT_LEAF_SIZE = 32
 
 class Polynomial:
     # representation:
+    # a polynomial is stored either sparsely, in self._dict, or densely, in self._coeffs,
+    # and the other one is None.
     # each item in self._dict represents a term.
     # the keys are the exponents and the values are the coefficients.
     # if an exponent is not in self._dict, the coefficient in the corresponding term is assumed to be 0
+    # self._coeffs is the list of the coefficients, where self._coeffs[expt] is the coefficient of x ^ expt.
     
-    # rep invariant: there will be no 0 coefficients.
+    # rep invariant: there will be no 0 coefficients in self._dict, and the last coefficient
+    # in self._coeffs is not 0. the polynomials whose degree and number of terms are large
+    # enough (see is_dense_enough) are stored densely, the others sparsely.
     
     # ==================================================
     # data abstraction functions
@@ -22,17 +50,40 @@ class Polynomial:
     @classmethod
     def zero(cls):
         # returns the zero polynomial
-        result = cls.__new__(cls)
-        result._dict = {}
-        return result
+        return cls._from_nonzero_dict({})
     
     @classmethod
     def from_dict(cls, d):
         # assumes @d is a dictionary which maps nonnegative integers to ints
         # returns the corresponding Polynomial
 
+        return cls._from_nonzero_dict({expt: coeff for expt, coeff in d.items() if coeff != 0})
+
+    @classmethod
+    def from_coeffs(cls, coeffs):
+        # assumes @coeffs is an iterable of ints, the coefficients of x ^ 0, x ^ 1, x ^ 2 and so on
+        # returns the corresponding Polynomial
+        coeffs = list(coeffs)
+        while coeffs and coeffs[-1] == 0:
+            coeffs.pop()
         result = cls.__new__(cls)
-        result._dict = {expt: coeff for expt, coeff in d.items() if coeff != 0}
+        if coeffs and is_dense_enough(len(coeffs) - coeffs.count(0), len(coeffs) - 1):
+            result._dict, result._coeffs = None, coeffs
+        else:
+            result._dict, result._coeffs = {expt: coeff for expt, coeff in enumerate(coeffs) if coeff != 0}, None
+        return result
+
+    @classmethod
+    def _from_nonzero_dict(cls, d):
+        # assumes @d maps nonnegative ints to nonzero ints
+        result = cls.__new__(cls)
+        if d and is_dense_enough(len(d), max(d)):
+            coeffs = [0] * (max(d) + 1)
+            for expt, coeff in d.items():
+                coeffs[expt] = coeff
+            result._dict, result._coeffs = None, coeffs
+        else:
+            result._dict, result._coeffs = d, None
         return result
 
     @classmethod
@@ -43,9 +94,7 @@ class Polynomial:
         result_dict = {}
         for expt, coeff in terms:
             result_dict[expt] = result_dict.get(expt, 0) + coeff
-        result = cls.__new__(cls)
-        result._dict = {expt: coeff for expt, coeff in result_dict.items() if coeff != 0}
-        return result
+        return cls._from_nonzero_dict({expt: coeff for expt, coeff in result_dict.items() if coeff != 0})
     
     @classmethod
     def from_str(cls, poly_str):
@@ -165,11 +214,42 @@ class Polynomial:
     def terms(self):
         # returns an iterator of (expt, coeff) pairs representing @self's non-zero terms.
         # the order is not specified.
+        if self._coeffs is not None:
+            return ((expt, coeff) for expt, coeff in enumerate(self._coeffs) if coeff != 0)
         return self._dict.items()
 
+    @property
+    def coeffs(self):
+        # returns a new list of the coefficients of x ^ 0, x ^ 1, ..., x ^ @self.degree
+        if self._coeffs is not None:
+            return list(self._coeffs)
+        result = [0] * (self.degree + 1)
+        for expt, coeff in self._dict.items():
+            result[expt] = coeff
+        return result
+
+    @property
+    def degree(self):
+        # the degree of the zero polynomial is taken to be -1
+        if self._coeffs is not None:
+            return len(self._coeffs) - 1
+        return max(self._dict, default=-1)
+
+    @property
+    def term_count(self):
+        # the number of nonzero terms
+        if self._coeffs is not None:
+            return len(self._coeffs) - self._coeffs.count(0)
+        return len(self._dict)
+
+    @property
+    def is_dense(self):
+        # True iff @self is stored as a list of coefficients
+        return self._coeffs is not None
+
     @property
     def is_zero(self):
-        return not self._dict
+        return self._coeffs is None and not self._dict
 
     def coeff_at(self, expt):
         # returns the coefficient of the term with exponent @expt
@@ -182,6 +262,8 @@ class Polynomial:
         if expt < 0:
             raise ValueError(f'expt should be a nonnegative integer; given: {expt}')
 
+        if self._coeffs is not None:
+            return self._coeffs[expt] if expt < len(self._coeffs) else 0
         return self._dict.get(expt, 0)
 
     def __str__(self):
@@ -234,4 +316,266 @@ class Polynomial:
         return Polynomial.from_terms((expt - 1, coeff * expt)
                                      for expt, coeff in self.terms
                                      if expt != 0)
-        
+
+    def __neg__(self):
+        if self.is_dense:
+            return Polynomial.from_coeffs([-coeff for coeff in self.coeffs])
+        return Polynomial.from_terms((expt, -coeff) for expt, coeff in self.terms)
+
+    def __add__(self, other):
+        # a dense polynomial is added to by coefficient lists, sparse ones term by term
+        if type(other) is not Polynomial:
+            return NotImplemented
+        if other.is_dense and not self.is_dense:
+            self, other = other, self
+        if not self.is_dense:
+            return Polynomial.from_terms(itertools.chain(self.terms, other.terms))
+        if other.is_dense:
+            return Polynomial.from_coeffs(add_coeffs(self.coeffs, other.coeffs))
+        coeffs = self.coeffs
+        coeffs.extend([0] * (other.degree - self.degree))
+        for expt, coeff in other.terms:
+            coeffs[expt] += coeff
+        return Polynomial.from_coeffs(coeffs)
+
+    def __sub__(self, other):
+        if type(other) is not Polynomial:
+            return NotImplemented
+        return self + -other
+
+    def __mul__(self, other):
+        # sparse polynomials are multiplied term by term. when that takes more multiplications than
+        # Karatsuba's method on the coefficient lists, the lists are multiplied (see multiply_coeffs)
+        if type(other) is not Polynomial:
+            return NotImplemented
+        if self.is_zero or other.is_zero:
+            return Polynomial.zero()
+        length = max(self.degree, other.degree) + 1
+        if self.term_count * other.term_count > length ** math.log2(3):
+            return Polynomial.from_coeffs(multiply_coeffs(self.coeffs, other.coeffs))
+        product = {}
+        for expt1, coeff1 in self.terms:
+            for expt2, coeff2 in other.terms:
+                product[expt1 + expt2] = product.get(expt1 + expt2, 0) + coeff1 * coeff2
+        return Polynomial.from_dict(product)
+
+    def evaluate(self, x):
+        # returns the value of @self at @x, by Horner's rule over the terms: between terms whose
+        # exponents differ by more than 1, the value is multiplied by a power of @x (which
+        # is computed by repeated squaring), instead of by @x for each missing term
+        result = 0
+        previous_expt = max(self.degree, 0)
+        for expt, coeff in sorted(self.terms, reverse=True):
+            result = result * x ** (previous_expt - expt) + coeff
+            previous_expt = expt
+        return result * x ** previous_expt
+
+    def evaluate_many(self, xs):
+        # returns the list of the values of @self at the points @xs (an array, if @xs is a numpy array).
+        # floats are evaluated with numpy, if it is available, by Horner's rule over whole arrays
+        # (numpy's powers may differ from python's in the last bit), and the other points with a
+        # function compiled for @self (see compile_evaluator)
+        is_array = numpy is not None and isinstance(xs, numpy.ndarray)
+        if is_array and xs.dtype.kind == 'f':
+            return self._evaluate_floats(xs)
+        xs = xs.tolist() if is_array else list(xs)
+        if numpy is not None and xs and all(type(x) is float for x in xs):
+            return self._evaluate_floats(numpy.array(xs)).tolist()
+        return list(map(self.compile_evaluator(), xs))
+
+    def evaluate_multipoint(self, xs):
+        # returns the list of the values of @self at the points @xs (ints or Fractions),
+        # by multipoint_evaluate
+        if self.is_zero:
+            return [0] * len(xs)
+        return multipoint_evaluate(self.coeffs, list(xs))
+
+    def _evaluate_floats(self, xs):
+        # assumes @xs is a numpy array of floats
+        result = numpy.zeros_like(xs)
+        previous_expt = max(self.degree, 0)
+        for expt, coeff in sorted(self.terms, reverse=True):
+            gap = previous_expt - expt
+            result = (result * xs if gap == 1 else result * xs ** gap if gap > 1 else result) + coeff
+            previous_expt = expt
+        return result * xs ** previous_expt if previous_expt > 0 else result
+
+    def compile_evaluator(self):
+        # returns a function of x which returns the same value as @self.evaluate(x). for polynomials
+        # with at most COMPILED_MAX_TERMS terms, its code is an assignment per term, with the
+        # coefficients and the exponents as constants
+        terms = sorted(self.terms, reverse=True)
+        if len(terms) > COMPILED_MAX_TERMS:
+            return self.evaluate
+        lines = []
+        previous_expt = 0
+        for expt, coeff in terms:
+            if not lines:
+                lines.append(f'    result = {coeff}\n')
+            elif previous_expt - expt == 1:
+                lines.append(f'    result = result * x + {coeff}\n')
+            else:
+                lines.append(f'    result = result * x ** {previous_expt - expt} + {coeff}\n')
+            previous_expt = expt
+        if not lines:
+            lines.append('    result = 0\n')
+        source = ('def evaluate(x):\n'
+                  + ''.join(lines)
+                  + f'    return result * x ** {previous_expt}\n')
+        namespace = {}
+        exec(compile(source, '<polynomial>', 'exec'), namespace)
+        return namespace['evaluate']
+
+def is_dense_enough(term_count, degree):
+    # True iff a polynomial of degree @degree with @term_count nonzero terms should be stored densely
+    return degree >= DENSE_MIN_DEGREE and term_count >= DENSE_MIN_DENSITY * (degree + 1)
+
+# ==================================================
+# operations on coefficient lists
+# the lists are not empty; the coefficient of x ^ i is at index i
+
+def add_coeffs(coeffs1, coeffs2):
+    # returns the list of the sums of the coefficients of @coeffs1 and @coeffs2
+    if len(coeffs1) < len(coeffs2):
+        coeffs1, coeffs2 = coeffs2, coeffs1
+    return list(map(operator.add, coeffs1, coeffs2)) + coeffs1[len(coeffs2):]
+
+def add_at(result, offset, coeffs, operation=operator.add):
+    # adds (or subtracts, with operator.sub) @coeffs to @result[@offset:], in place
+    end = offset + len(coeffs)
+    result[offset:end] = map(operation, result[offset:end], coeffs)
+
+def multiply_coeffs(coeffs1, coeffs2):
+    # returns the coefficients of the product of the polynomials with coefficients @coeffs1 and @coeffs2,
+    # by fft_product if they are long enough and it can be used, and by karatsuba_product otherwise
+    if min(len(coeffs1), len(coeffs2)) >= FFT_THRESHOLD:
+        product = fft_product(coeffs1, coeffs2)
+        if product is not None:
+            return product
+    return karatsuba_product(coeffs1, coeffs2)
+
+def schoolbook_product(coeffs1, coeffs2):
+    # multiplies every coefficient by every other one
+    result = [0] * (len(coeffs1) + len(coeffs2) - 1)
+    for i, coeff in enumerate(coeffs1):
+        if coeff != 0:
+            add_at(result, i, list(map(operator.mul, itertools.repeat(coeff), coeffs2)))
+    return result
+
+def karatsuba_product(coeffs1, coeffs2):
+    # splits the longer list in halves, (low1, high1), and multiplies with 3 products instead of 4:
+    # low1 * low2, high1 * high2 and (low1 + high1) * (low2 + high2).
+    # when the shorter list is shorter than a half, the longer one is multiplied by it in pieces
+    if len(coeffs1) < len(coeffs2):
+        coeffs1, coeffs2 = coeffs2, coeffs1
+    length1, length2 = len(coeffs1), len(coeffs2)
+    if length2 <= KARATSUBA_THRESHOLD:
+        return schoolbook_product(coeffs1, coeffs2)
+    result = [0] * (length1 + length2 - 1)
+    half = length1 // 2
+    if length2 <= half:
+        for start in range(0, length1, length2):
+            add_at(result, start, karatsuba_product(coeffs1[start:start + length2], coeffs2))
+        return result
+    low1, high1, low2, high2 = coeffs1[:half], coeffs1[half:], coeffs2[:half], coeffs2[half:]
+    low = karatsuba_product(low1, low2)
+    high = karatsuba_product(high1, high2)
+    middle = karatsuba_product(add_coeffs(low1, high1), add_coeffs(low2, high2))
+    add_at(middle, 0, low, operator.sub)
+    add_at(middle, 0, high, operator.sub)
+    add_at(result, 0, low)
+    add_at(result, 2 * half, high)
+    # the coefficients of middle past the end of result are 0
+    add_at(result, half, middle[:len(result) - half])
+    return result
+
+def fft_product(coeffs1, coeffs2):
+    # multiplies the lists by convolution with numpy's FFT over floats, and rounds the products to ints.
+    # returns None if numpy is not available, if some coefficient is not an int, or if the
+    # rounding errors could be large enough to round a product to a wrong int
+    if numpy is None or not all(type(coeff) is int for coeff in itertools.chain(coeffs1, coeffs2)):
+        return None
+    length = len(coeffs1) + len(coeffs2) - 1
+    size = 1 << (length - 1).bit_length()
+    bound = max(map(abs, coeffs1)) * max(map(abs, coeffs2)) * min(len(coeffs1), len(coeffs2))
+    if bound * size.bit_length() >= FFT_MAX_BOUND:
+        return None
+    product = numpy.fft.irfft(numpy.fft.rfft(coeffs1, size) * numpy.fft.rfft(coeffs2, size), size)[:length]
+    rounded = numpy.rint(product)
+    if numpy.abs(product - rounded).max() > FFT_MAX_ROUNDING_ERROR:
+        return None
+    return rounded.astype(numpy.int64).tolist()
+
+def horner(coeffs, x):
+    # returns the value at @x of the polynomial with coefficients @coeffs
+    result = 0
+    for coeff in reversed(coeffs):
+        result = result * x + coeff
+    return result
+
+def remainder(coeffs, divisor):
+    # assumes @divisor is monic (its last coefficient is 1) of degree at least 1
+    # returns the coefficients of the remainder of @coeffs divided by @divisor (as many as the degree
+    # of @divisor). when the quotient is long, it is computed as the product of the reversed
+    # @coeffs and the inverse of the reversed @divisor as a power series (see reversed_inverse),
+    # so with multiply_coeffs; otherwise by long division
+    degree = len(divisor) - 1
+    quotient_length = len(coeffs) - degree
+    if quotient_length <= 0:
+        return list(coeffs)
+    if min(quotient_length, degree) <= KARATSUBA_THRESHOLD:
+        result = list(coeffs)
+        for expt in range(len(coeffs) - 1, degree - 1, -1):
+            coeff = result[expt]
+            if coeff != 0:
+                add_at(result, expt - degree, list(map(operator.mul, itertools.repeat(coeff), divisor)),
+                       operator.sub)
+        return result[:degree]
+    inverse = reversed_inverse(divisor, quotient_length)
+    quotient = multiply_coeffs(coeffs[:degree - 1:-1][:quotient_length], inverse)[quotient_length - 1::-1]
+    product = multiply_coeffs(quotient, divisor)
+    return list(map(operator.sub, coeffs[:degree], product))
+
+def reversed_inverse(divisor, length):
+    # assumes @divisor is monic
+    # returns the first @length coefficients of the power series 1 / (the reversed @divisor), by
+    # Newton's iteration: if inverse is correct to n terms, inverse * (2 - reversed * inverse) is
+    # correct to 2n terms
+    reversed_divisor = divisor[::-1]
+    inverse = [1]
+    while len(inverse) < length:
+        precision = min(2 * len(inverse), length)
+        error = [-coeff for coeff in multiply_coeffs(reversed_divisor[:precision], inverse)[:precision]]
+        error[0] += 2
+        inverse = multiply_coeffs(inverse, error)[:precision]
+    return inverse
+
+def multipoint_evaluate(coeffs, points):
+    # returns the list of the values at the @points of the polynomial with coefficients @coeffs.
+    # the points are split in leaves of MULTIPOINT_LEAF_SIZE points, and the subproduct tree is
+    # made: the products of (x - point) for each leaf, then the products of pairs of them and so
+    # on, to the product of all. the polynomial is reduced modulo the root, and each remainder
+    # modulo the children of its node (a polynomial has the same values as its remainder at the
+    # points of the divisor), and the remainders of the leaves, whose degrees are less than
+    # MULTIPOINT_LEAF_SIZE, are evaluated at their points by Horner's rule.
+    # the divisions are exact, so the points should be ints or Fractions, not floats.
+    # notice: the coefficients of the products (and of the inverses in remainder) have about
+    # (the degree) * log2(the points) bits, so with python's ints this is slower than evaluating
+    # the polynomial at each point with compile_evaluator (see bench_evaluation.py)
+    if not points:
+        return []
+    leaves = [points[start:start + MULTIPOINT_LEAF_SIZE] for start in range(0, len(points), MULTIPOINT_LEAF_SIZE)]
+    levels = [[]]
+    for leaf in leaves:
+        product = [1]
+        for point in leaf:
+            product = add_coeffs([0] + product, [-point * coeff for coeff in product])
+        levels[0].append(product)
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        levels.append([multiply_coeffs(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                       for i in range(0, len(level), 2)])
+    remainders = [coeffs]
+    for level in reversed(levels):
+        remainders = [remainder(remainders[i // 2], node) for i, node in enumerate(level)]
+    return [horner(rest, point) for leaf, rest in zip(leaves, remainders) for point in leaf]
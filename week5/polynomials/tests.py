@@ -1,4 +1,7 @@
+import random
+from fractions import Fraction
 import unittest
+import polynomial
 from polynomial import Polynomial
 
 class TestPolynomial(unittest.TestCase):
@@ -64,6 +67,75 @@ class TestPolynomial(unittest.TestCase):
         # for the term with coefficient 1 or -1, the '1' is not shown
         self.assertEqual(str(Polynomial.from_str('x^2 + 1*x^3')), 'x ^ 3 + x ^ 2')
         self.assertEqual(str(Polynomial.from_str('x^2 - 1*x^3')), '- x ^ 3 + x ^ 2')
+
+    def test_arithmetic(self):
+        p, q = Polynomial.from_str('x^2 + 2*x + 1'), Polynomial.from_str('x - 1')
+        self.assertEqual(p + q, Polynomial.from_str('x^2 + 3*x'))
+        self.assertEqual(p - q, Polynomial.from_str('x^2 + x + 2'))
+        self.assertEqual(p * q, Polynomial.from_str('x^3 + x^2 - x - 1'))
+        self.assertTrue((p - p).is_zero)
+        self.assertTrue((p * Polynomial.zero()).is_zero)
+
+        # compared with multiplying term by term, for sparse and dense polynomials of various degrees
+        rand = random.Random(0)
+        def random_polynomial():
+            degree, density = rand.choice([0, 5, 70, 300, 1000]), rand.random()
+            return Polynomial.from_dict({expt: rand.randrange(-9, 10)
+                                         for expt in range(degree + 1) if rand.random() < density})
+        for i in range(100):
+            p, q = random_polynomial(), random_polynomial()
+            expected = Polynomial.from_terms((expt1 + expt2, coeff1 * coeff2)
+                                             for expt1, coeff1 in p.terms for expt2, coeff2 in q.terms)
+            self.assertEqual(p * q, expected)
+            self.assertEqual(p + q, Polynomial.from_terms(list(p.terms) + list(q.terms)))
+            self.assertEqual(p - q + q, p)
+
+    def test_dense_representation(self):
+        # polynomials of high degree with many terms are stored as coefficient lists
+        self.assertFalse(Polynomial.from_str('x^100 + 1').is_dense)
+        dense = Polynomial.from_coeffs(range(1, 101))
+        self.assertTrue(dense.is_dense)
+        self.assertEqual(dense.degree, 99)
+        self.assertEqual(dense.coeff_at(5), 6)
+        self.assertEqual(dense.coeff_at(500), 0)
+        self.assertEqual(dense, Polynomial.from_dict({expt: expt + 1 for expt in range(100)}))
+        self.assertFalse((dense - Polynomial.from_coeffs(range(1, 90))).is_dense)
+        self.assertEqual(Polynomial.from_coeffs([1, 2, 0, 0]), Polynomial.from_str('2*x + 1'))
+        self.assertEqual(Polynomial.zero().degree, -1)
+
+    def test_multiplication_algorithms(self):
+        rand = random.Random(0)
+        for length1, length2 in [(1, 1), (40, 33), (100, 7), (257, 200), (500, 100)]:
+            coeffs1 = [rand.randrange(-10 ** 6, 10 ** 6) for i in range(length1)]
+            coeffs2 = [rand.randrange(-10 ** 6, 10 ** 6) for i in range(length2)]
+            expected = polynomial.schoolbook_product(coeffs1, coeffs2)
+            self.assertEqual(polynomial.karatsuba_product(coeffs1, coeffs2), expected)
+            self.assertIn(polynomial.fft_product(coeffs1, coeffs2), (None, expected))
+        # the coefficients of the product are too large for floats
+        self.assertIsNone(polynomial.fft_product([2 ** 40] * 100, [2 ** 40] * 100))
+
+    def test_evaluate(self):
+        p = Polynomial.from_str('2*x^10 - x^3 + 5')
+        self.assertEqual(p.evaluate(2), 2045)
+        self.assertEqual(p.evaluate(0), 5)
+        self.assertEqual(p.evaluate(Fraction(1, 2)), Fraction(2 * 1 - 128 + 5 * 1024, 1024))
+        self.assertEqual(p.evaluate(0.5), 2 / 1024 - 1 / 8 + 5)
+        self.assertEqual(Polynomial.zero().evaluate(3), 0)
+        self.assertEqual(Polynomial.from_str('x^4').evaluate(3), 81)
+
+        rand = random.Random(0)
+        for i in range(50):
+            degree, density = rand.choice([0, 3, 70, 200]), rand.random()
+            p = Polynomial.from_dict({expt: rand.randrange(-9, 10)
+                                      for expt in range(degree + 1) if rand.random() < density})
+            xs = [rand.randrange(-20, 21) for i in range(40)] + [Fraction(2, 3)]
+            expected = [sum(coeff * x ** expt for expt, coeff in p.terms) for x in xs]
+            self.assertEqual([p.evaluate(x) for x in xs], expected)
+            self.assertEqual(p.evaluate_many(xs), expected)
+            self.assertEqual(p.evaluate_multipoint(xs), expected)
+            floats = [rand.uniform(-2, 2) for i in range(10)]
+            for value, x in zip(p.evaluate_many(floats), floats):
+                self.assertAlmostEqual(value, p.evaluate(x), delta=1e-9 * max(1, abs(value)))
         
 
 unittest.main()